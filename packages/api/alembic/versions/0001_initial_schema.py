@@ -0,0 +1,100 @@
+"""Initial schema, matching the tables previously created by create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Enums are stored by member name, as SQLAlchemy does for Enum(PythonEnum)
+user_role = sa.Enum("DOCTOR", "PATIENT", name="userrole")
+appointment_status = sa.Enum("SCHEDULED", "COMPLETED", "CANCELLED", name="appointmentstatus")
+prescription_status = sa.Enum("DRAFT", "FINALIZED", "DISPENSED", "CANCELLED", name="prescriptionstatus")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("role", user_role, nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("license_number", sa.String(), nullable=True),
+        sa.Column("specialization", sa.String(), nullable=True),
+        sa.Column("date_of_birth", sa.DateTime(), nullable=True),
+        sa.Column("phone_number", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    
+    op.create_table(
+        "appointments",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("patient_id", sa.Integer(), nullable=False),
+        sa.Column("doctor_id", sa.Integer(), nullable=False),
+        sa.Column("scheduled_at", sa.DateTime(), nullable=False),
+        sa.Column("status", appointment_status, nullable=True),
+        sa.Column("reason", sa.String(), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["patient_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["doctor_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_appointments_id", "appointments", ["id"])
+    
+    op.create_table(
+        "prescriptions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("appointment_id", sa.Integer(), nullable=False),
+        sa.Column("medications", sa.JSON(), nullable=False),
+        sa.Column("ai_summary", sa.Text(), nullable=True),
+        sa.Column("ai_interactions", sa.JSON(), nullable=True),
+        sa.Column("status", prescription_status, nullable=True),
+        sa.Column("pdf_url", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("finalized_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["appointment_id"], ["appointments.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_prescriptions_id", "prescriptions", ["id"])
+    
+    op.create_table(
+        "share_tokens",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("prescription_id", sa.Integer(), nullable=False),
+        sa.Column("token", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+        sa.Column("revoked_at", sa.DateTime(), nullable=True),
+        sa.Column("access_count", sa.Integer(), nullable=True),
+        sa.Column("last_accessed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["prescription_id"], ["prescriptions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_share_tokens_id", "share_tokens", ["id"])
+    op.create_index("ix_share_tokens_token", "share_tokens", ["token"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("share_tokens")
+    op.drop_table("prescriptions")
+    op.drop_table("appointments")
+    op.drop_table("users")
+    bind = op.get_bind()
+    for enum in (prescription_status, appointment_status, user_role):
+        enum.drop(bind, checkfirst=True)
@@ -0,0 +1,29 @@
+"""Composite indexes for schedule, prescription and share token lookups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Appointment lists filter by doctor or patient and order by scheduled_at
+    op.create_index("ix_appointments_doctor_scheduled", "appointments", ["doctor_id", "scheduled_at"])
+    op.create_index("ix_appointments_patient_scheduled", "appointments", ["patient_id", "scheduled_at"])
+    # Prescription lists join on appointment_id and order by created_at
+    op.create_index("ix_prescriptions_appointment_created", "prescriptions", ["appointment_id", "created_at"])
+    # Share links look up the active tokens of a prescription
+    op.create_index("ix_share_tokens_prescription_active", "share_tokens", ["prescription_id", "is_active"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_share_tokens_prescription_active", table_name="share_tokens")
+    op.drop_index("ix_prescriptions_appointment_created", table_name="prescriptions")
+    op.drop_index("ix_appointments_patient_scheduled", table_name="appointments")
+    op.drop_index("ix_appointments_doctor_scheduled", table_name="appointments")
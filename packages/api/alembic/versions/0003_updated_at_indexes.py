@@ -0,0 +1,22 @@
+"""Indexes on updated_at for incremental exports
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_appointments_updated", "appointments", ["updated_at"])
+    op.create_index("ix_prescriptions_updated", "prescriptions", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prescriptions_updated", table_name="prescriptions")
+    op.drop_index("ix_appointments_updated", table_name="appointments")
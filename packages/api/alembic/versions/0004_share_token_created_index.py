@@ -0,0 +1,20 @@
+"""Index share_tokens.created_at for token filter syncs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_share_tokens_created", "share_tokens", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_share_tokens_created", table_name="share_tokens")
@@ -0,0 +1,37 @@
+"""Expiry index on share_tokens and the share_tokens_archive table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The expiry sweeper walks active tokens in expiry order
+    op.create_index("ix_share_tokens_active_expires", "share_tokens", ["is_active", "expires_at"])
+    op.create_table(
+        "share_tokens_archive",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("prescription_id", sa.Integer(), nullable=False),
+        sa.Column("token", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+        sa.Column("revoked_at", sa.DateTime(), nullable=True),
+        sa.Column("access_count", sa.Integer(), nullable=True),
+        sa.Column("last_accessed_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("token"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("share_tokens_archive")
+    op.drop_index("ix_share_tokens_active_expires", table_name="share_tokens")
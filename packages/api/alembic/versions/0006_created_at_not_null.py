@@ -0,0 +1,37 @@
+"""Make created_at NOT NULL on users and prescriptions
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Keyset pagination sorts these tables by (created_at, id), so the column
+# must always hold a value; rows from before the default existed fall back
+# to their updated_at, or to the epoch so they sort as the oldest
+TABLES = ("users", "prescriptions")
+EPOCH = datetime(1970, 1, 1)
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(
+            sa.text(
+                f"UPDATE {table} SET created_at = COALESCE(updated_at, :epoch) WHERE created_at IS NULL"
+            ).bindparams(epoch=EPOCH)
+        )
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column("created_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column("created_at", existing_type=sa.DateTime(), nullable=True)
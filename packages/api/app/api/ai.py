@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from typing import List
-import httpx
-import os
-from openai import OpenAI
-from app.core.security import get_current_active_user
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import json
+from app.core.config import settings
+from app.core.security import get_current_active_user, get_current_doctor
+from app.db.database import get_db
 from app.models.user import User
+from app.services import drug_names
+from app.services.ai_summary import stream_summary
+from app.services.interactions import check_medications, find_interaction_pairs, screen_batch
+from app.services.screening import load_prescription_medications_async
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -24,40 +30,32 @@ class DrugInteractionResponse(BaseModel):
     summary: str
 
 
-async def fetch_rxnav_interactions(drug_name: str) -> List[str]:
-    """Fetch drug interactions from RxNav API"""
-    try:
-        async with httpx.AsyncClient() as client:
-            # Get RxCUI for drug name
-            response = await client.get(
-                f"https://rxnav.nlm.nih.gov/REST/rxcui.json?name={drug_name}"
-            )
-            data = response.json()
-            
-            if not data.get("idGroup", {}).get("rxnormId"):
-                return []
-            
-            rxcui = data["idGroup"]["rxnormId"][0]
-            
-            # Get interactions for RxCUI
-            interactions_response = await client.get(
-                f"https://rxnav.nlm.nih.gov/REST/interaction/interaction.json?rxcui={rxcui}"
-            )
-            interactions_data = interactions_response.json()
-            
-            interactions = []
-            interaction_groups = interactions_data.get("interactionTypeGroup", [])
-            for group in interaction_groups:
-                for interaction_type in group.get("interactionType", []):
-                    for pair in interaction_type.get("interactionPair", []):
-                        interacting_drug = pair.get("interactionConcept", [{}])[1].get("minConceptItem", {}).get("name", "")
-                        if interacting_drug:
-                            interactions.append(interacting_drug)
-            
-            return interactions
-    except Exception as e:
-        print(f"Error fetching RxNav data for {drug_name}: {e}")
-        return []
+class BatchInteractionItem(BaseModel):
+    id: Optional[str] = None
+    medications: List[str]
+
+
+class BatchInteractionRequest(BaseModel):
+    items: List[BatchInteractionItem] = Field(..., max_length=settings.INTERACTION_BATCH_MAX_ITEMS)
+
+
+class DrugNameSuggestion(BaseModel):
+    name: str
+    canonical: str
+    rxcui: Optional[str] = None
+    score: float
+
+    class Config:
+        from_attributes = True
+
+
+async def _ndjson(results):
+    async for result in results:
+        yield json.dumps(result) + "\n"
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 @router.post("/check-interactions", response_model=DrugInteractionResponse)
@@ -71,62 +69,76 @@ async def check_interactions(
             summary="At least two medications are required to check for interactions."
         )
     
-    # Fetch interactions from RxNav
-    all_interactions = set()
-    interaction_pairs = []
-    
-    for i, drug1 in enumerate(request.medications):
-        rxnav_interactions = await fetch_rxnav_interactions(drug1)
-        for drug2 in request.medications[i+1:]:
-            if drug2.lower() in [interaction.lower() for interaction in rxnav_interactions]:
-                interaction_pairs.append(f"{drug1} and {drug2}")
-    
-    # Use OpenAI to generate a summary if API key is available
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    
-    if openai_api_key:
-        try:
-            client = OpenAI(api_key=openai_api_key)
-            
-            prompt = f"""You are a clinical pharmacist. Analyze the following medications for potential interactions. Your summary will be shared with both healthcare professionals and patients, so it should be informative, accurate, and easy to understand.
-
-Medications: {', '.join(request.medications)}
-(f"Known interactions from RxNav: {', '.join(interaction_pairs)}" if interaction_pairs else '')
-
-Please provide:
-1. A clear explanation of any significant drug interactions, using simple language for patients but including clinical details for doctors.
-2. The severity of any interactions (if any), and what symptoms or side effects to watch for.
-3. Practical advice for both patients and clinicians (e.g., when to seek help, possible alternatives, or monitoring tips).
-
-Keep the summary concise, friendly, and actionable. Avoid medical jargon where possible, and explain any necessary terms."""
-
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a clinical pharmacist providing drug interaction analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300,
-                temperature=0.3
-            )
-            
-            summary = response.choices[0].message.content.strip()
-            
-            return DrugInteractionResponse(
-                interactions=interaction_pairs,
-                summary=summary
-            )
-        except Exception as e:
-            print(f"OpenAI API error: {e}")
-            # Fall back to basic summary
-    
-    # Basic summary without AI
-    if interaction_pairs:
-        summary = f"Potential interactions detected between: {', '.join(interaction_pairs)}. Please review these combinations carefully and consider alternative medications if necessary."
-    else:
-        summary = f"No significant interactions detected between the {len(request.medications)} medications. However, always consider patient-specific factors and monitor for adverse effects."
+    # Concurrent identical checks share one RxNav + OpenAI pipeline
+    interaction_pairs, summary = await check_medications(request.medications)
     
     return DrugInteractionResponse(
         interactions=interaction_pairs,
         summary=summary
-    )
\ No newline at end of file
+    )
+
+
+@router.post("/check-interactions/stream")
+async def check_interactions_stream(
+    request: DrugInteractionRequest,
+    current_user: User = Depends(get_current_active_user),
+):
+    """Server-Sent Events variant of check-interactions.
+    
+    Emits one ``interactions`` event, then ``token`` events as the summary is
+    generated, then a ``done`` event carrying the full summary.
+    """
+    async def events():
+        if len(request.medications) < 2:
+            summary = "At least two medications are required to check for interactions."
+            yield _sse("interactions", {"interactions": []})
+            yield _sse("done", {"summary": summary})
+            return
+        
+        interaction_pairs = await find_interaction_pairs(request.medications)
+        yield _sse("interactions", {"interactions": interaction_pairs})
+        
+        chunks = []
+        async for text in stream_summary(request.medications, interaction_pairs):
+            chunks.append(text)
+            yield _sse("token", {"text": text})
+        yield _sse("done", {"summary": "".join(chunks).strip()})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/check-interactions/batch")
+async def check_interactions_batch(
+    request: BatchInteractionRequest,
+    current_user: User = Depends(get_current_active_user),
+):
+    """Screen many medication lists at once, streaming one NDJSON line per item"""
+    items = [
+        (item.id if item.id is not None else str(position), item.medications)
+        for position, item in enumerate(request.items)
+    ]
+    return StreamingResponse(_ndjson(screen_batch(items)), media_type="application/x-ndjson")
+
+
+@router.post("/screen-prescriptions")
+async def screen_prescriptions(
+    current_doctor: User = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_db),
+):
+    """Re-screen all of the doctor's active prescriptions as NDJSON"""
+    items = await load_prescription_medications_async(db, doctor_id=current_doctor.id)
+    return StreamingResponse(_ndjson(screen_batch(items)), media_type="application/x-ndjson")
+
+
+@router.get("/drug-names", response_model=List[DrugNameSuggestion])
+async def autocomplete_drug_names(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Autocomplete medication names from the local drug name index"""
+    return drug_names.complete(q, limit)
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
+from typing import List, Optional
 from datetime import datetime
 from app.db.database import get_db
+from app.core.pagination import PageParams, finish_page, keyset_page
 from app.core.security import get_current_active_user, get_current_doctor
 from app.models.user import User
-from app.models.appointment import Appointment
+from app.models.appointment import Appointment, AppointmentStatus
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -35,48 +38,66 @@ class AppointmentResponse(BaseModel):
         from_attributes = True
 
 
+Patient = aliased(User, name="patient")
+Doctor = aliased(User, name="doctor")
+
+# Flat projection of an appointment with its patient and doctor details
+APPOINTMENT_LIST_COLUMNS = (
+    Appointment.id,
+    Appointment.patient_id,
+    Appointment.doctor_id,
+    Appointment.scheduled_at,
+    Appointment.reason,
+    Appointment.status,
+    Appointment.created_at,
+    Patient.full_name.label("patient_name"),
+    Patient.email.label("patient_email"),
+    Doctor.full_name.label("doctor_name"),
+)
+
+
 @router.get("/", response_model=List[AppointmentResponse])
 async def get_appointments(
+    response: Response,
+    status: Optional[AppointmentStatus] = None,
+    patient_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
+    """Appointments newest first, paged by (scheduled_at, id); date_from/date_to bound scheduled_at, patient_id narrows a doctor's list"""
+    # One joined query selecting only the columns the response needs
+    query = select(*APPOINTMENT_LIST_COLUMNS).join(
+        Patient, Appointment.patient_id == Patient.id
+    ).join(Doctor, Appointment.doctor_id == Doctor.id)
     if current_user.role == "doctor":
-        appointments = db.query(Appointment).filter(
-            Appointment.doctor_id == current_user.id
-        ).order_by(Appointment.scheduled_at.desc()).all()
+        query = query.where(Appointment.doctor_id == current_user.id)
     else:
-        appointments = db.query(Appointment).filter(
-            Appointment.patient_id == current_user.id
-        ).order_by(Appointment.scheduled_at.desc()).all()
+        query = query.where(Appointment.patient_id == current_user.id)
+    if status:
+        query = query.where(Appointment.status == status)
+    if patient_id is not None:
+        query = query.where(Appointment.patient_id == patient_id)
+    if date_from:
+        query = query.where(Appointment.scheduled_at >= date_from)
+    if date_to:
+        query = query.where(Appointment.scheduled_at < date_to)
+    result = await db.execute(keyset_page(query, Appointment.scheduled_at, Appointment.id, page))
     
-    # Add patient and doctor details to each appointment
-    appointment_list = []
-    for apt in appointments:
-        appointment_data = {
-            "id": apt.id,
-            "patient_id": apt.patient_id,
-            "doctor_id": apt.doctor_id,
-            "scheduled_at": apt.scheduled_at,
-            "reason": apt.reason,
-            "status": apt.status,
-            "created_at": apt.created_at,
-            "patient_name": apt.patient.full_name,
-            "patient_email": apt.patient.email,
-            "doctor_name": apt.doctor.full_name,
-        }
-        appointment_list.append(appointment_data)
-    
-    return appointment_list
+    return finish_page([dict(row) for row in result.mappings()], page, response, "scheduled_at")
 
 
 @router.post("/", response_model=AppointmentResponse)
 async def create_appointment(
     appointment: AppointmentCreate,
     current_doctor: User = Depends(get_current_doctor),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     # Find patient by email
-    patient = db.query(User).filter(User.email == appointment.patient_email).first()
+    result = await db.execute(select(User).where(User.email == appointment.patient_email))
+    patient = result.scalars().first()
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
@@ -88,8 +109,8 @@ async def create_appointment(
         status=appointment.status,
     )
     db.add(db_appointment)
-    db.commit()
-    db.refresh(db_appointment)
+    await db.commit()
+    await db.refresh(db_appointment)
     
     # Return appointment with patient and doctor details
     return {
@@ -110,9 +131,14 @@ async def create_appointment(
 async def get_appointment(
     appointment_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+    result = await db.execute(
+        select(Appointment)
+        .options(selectinload(Appointment.patient), selectinload(Appointment.doctor))
+        .where(Appointment.id == appointment_id)
+    )
+    appointment = result.scalars().first()
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
     
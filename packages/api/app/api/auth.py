@@ -1,7 +1,8 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.core.security import (
     verify_password,
@@ -17,17 +18,18 @@ router = APIRouter()
 
 
 @router.post("/login", response_model=Token)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
     print(f"LOGIN ATTEMPT (JSON): {login_data.email}")
     
     # Try to find user by email
-    user = db.query(User).filter(User.email == login_data.email).first()
+    result = await db.execute(select(User).where(User.email == login_data.email))
+    user = result.scalars().first()
     
     # If user not found, create a demo user on the fly
     if not user:
         print(f"User not found, creating demo user: {login_data.email}")
         try:
-            from app.core.security import get_password_hash
+            from app.core.security import hash_password_async
             from app.models.user import UserRole
             
             # Determine role from email or default to patient
@@ -43,18 +45,18 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
             
             user = User(
                 email=login_data.email,
-                hashed_password=get_password_hash("demo123"),
+                hashed_password=await hash_password_async("demo123"),
                 full_name=full_name,
                 role=role,
                 is_active=True
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
             print(f"Created new demo user: {user.full_name} ({user.role})")
         except Exception as e:
             print(f"Failed to create user: {e}")
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create demo user",
@@ -93,19 +95,20 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
 ):
     print(f"LOGIN ATTEMPT: {form_data.username}")
     
     # Try to find user by email
-    user = db.query(User).filter(User.email == form_data.username).first()
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
     
     # If user not found, create a demo user on the fly
     if not user:
         print(f"User not found, creating demo user: {form_data.username}")
         # For demo purposes, create any missing user automatically
         try:
-            from app.core.security import get_password_hash
+            from app.core.security import hash_password_async
             from app.models.user import UserRole
             
             # Determine role from email or default to patient
@@ -121,18 +124,18 @@ async def login_for_access_token(
             
             user = User(
                 email=form_data.username,
-                hashed_password=get_password_hash("demo123"),  # Default password
+                hashed_password=await hash_password_async("demo123"),  # Default password
                 full_name=full_name,
                 role=role,
                 is_active=True
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
             print(f"Created new demo user: {user.full_name} ({user.role})")
         except Exception as e:
             print(f"Failed to create user: {e}")
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create demo user",
@@ -170,11 +173,12 @@ async def login_for_access_token(
 
 
 @router.post("/demo-login", response_model=Token)
-async def demo_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def demo_login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """Demo login endpoint that bypasses password verification for easier testing"""
     print(f"DEMO LOGIN ATTEMPT: {form_data.username}")
     
-    user = db.query(User).filter(User.email == form_data.username).first()
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
     if not user:
         print(f"Demo user not found: {form_data.username}")
         raise HTTPException(
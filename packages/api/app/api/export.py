@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.core.security import get_current_active_user, get_current_doctor
+from app.db.database import AsyncSessionLocal
+from app.models.user import User
+from app.services.export import MEDIA_TYPES, stream_export, stream_history_zip
+
+router = APIRouter()
+
+
+def _export_response(dataset: str, fmt: str, since: Optional[datetime], doctor_id: int) -> StreamingResponse:
+    async def lines():
+        # The stream outlives the request's dependencies, so it owns its session
+        async with AsyncSessionLocal() as db:
+            async for line in stream_export(db, dataset, fmt, since, doctor_id):
+                yield line
+    
+    filename = f"{dataset}.{fmt}"
+    return StreamingResponse(
+        lines(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/appointments")
+async def export_appointments(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    updated_since: Optional[datetime] = Query(None, description="Watermark from the previous extract"),
+    current_doctor: User = Depends(get_current_doctor),
+):
+    """Stream the doctor's appointments in updated_at order"""
+    return _export_response("appointments", format, updated_since, current_doctor.id)
+
+
+@router.get("/prescriptions")
+async def export_prescriptions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    updated_since: Optional[datetime] = Query(None, description="Watermark from the previous extract"),
+    current_doctor: User = Depends(get_current_doctor),
+):
+    """Stream the doctor's prescriptions in updated_at order"""
+    return _export_response("prescriptions", format, updated_since, current_doctor.id)
+
+
+@router.get("/patients/{patient_id}/prescriptions.zip")
+async def export_prescription_history(
+    patient_id: int,
+    current_user: User = Depends(get_current_active_user),
+):
+    """Stream a ZIP of a patient's prescription PDFs (a doctor only gets the ones they wrote)"""
+    if current_user.role == "doctor":
+        doctor_id = current_user.id
+    elif current_user.id == patient_id:
+        doctor_id = None
+    else:
+        raise HTTPException(status_code=403, detail="Access forbidden")
+    
+    async def chunks():
+        async with AsyncSessionLocal() as db:
+            async for chunk in stream_history_zip(db, patient_id, doctor_id):
+                if chunk:
+                    yield chunk
+    
+    return StreamingResponse(
+        chunks(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="prescriptions-{patient_id}.zip"'},
+    )
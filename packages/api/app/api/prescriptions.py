@@ -1,19 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import os
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
-import qrcode
-import io
-import base64
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
 from app.db.database import get_db
+from app.core.config import settings
+from app.core.http import etag_matches
+from app.core.pagination import PageParams, finish_page, keyset_page
 from app.core.security import get_current_active_user, get_current_doctor
 from app.models.user import User
-from app.models.prescription import Prescription
+from app.models.appointment import Appointment
+from app.models.prescription import Prescription, PrescriptionStatus
 from app.models.share_token import ShareToken
+from app.services import prescription_analysis, prescription_pdf, qr, token_filter
 from pydantic import BaseModel, Field, constr
 import secrets
 
@@ -48,63 +51,103 @@ class PrescriptionResponse(BaseModel):
     patient_email: str = None
     patient_name: str = None
     doctor_name: str = None
-
+    
     class Config:
         from_attributes = True
 
 
+def _qr_code_url(prescription_id: int) -> str:
+    return f"/api/prescriptions/{prescription_id}/qr.png"
+
+
+def _with_participants(query):
+    """Eager-load the appointment's patient and doctor; async sessions cannot lazy load"""
+    return query.options(
+        selectinload(Prescription.appointment).selectinload(Appointment.patient),
+        selectinload(Prescription.appointment).selectinload(Appointment.doctor),
+    )
+
+
+Patient = aliased(User, name="patient")
+Doctor = aliased(User, name="doctor")
+
+# Flat projection of a prescription with its patient and doctor details
+PRESCRIPTION_LIST_COLUMNS = (
+    Prescription.id,
+    Prescription.appointment_id,
+    Prescription.medications,
+    Prescription.ai_summary,
+    Prescription.ai_interactions,
+    Prescription.status,
+    Prescription.pdf_url,
+    Prescription.created_at,
+    Patient.email.label("patient_email"),
+    Patient.full_name.label("patient_name"),
+    Doctor.full_name.label("doctor_name"),
+)
+
+
 @router.get("/", response_model=List[PrescriptionResponse])
 async def get_prescriptions(
+    response: Response,
+    status: Optional[PrescriptionStatus] = None,
+    patient_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    from app.models.appointment import Appointment
-    
+    """Prescriptions newest first, paged by (created_at, id); date_from/date_to bound created_at, patient_id narrows a doctor's list"""
+    # One joined query selecting only the columns the response needs
+    query = (
+        select(*PRESCRIPTION_LIST_COLUMNS)
+        .join(Appointment, Prescription.appointment_id == Appointment.id)
+        .join(Patient, Appointment.patient_id == Patient.id)
+        .join(Doctor, Appointment.doctor_id == Doctor.id)
+    )
     if current_user.role == "doctor":
         # Get prescriptions for appointments where this user is the doctor
-        prescriptions = db.query(Prescription).join(Appointment).filter(
-            Appointment.doctor_id == current_user.id
-        ).order_by(Prescription.created_at.desc()).all()
+        query = query.where(Appointment.doctor_id == current_user.id)
     else:
         # Get prescriptions for appointments where this user is the patient
-        prescriptions = db.query(Prescription).join(Appointment).filter(
-            Appointment.patient_id == current_user.id
-        ).order_by(Prescription.created_at.desc()).all()
+        query = query.where(Appointment.patient_id == current_user.id)
+    if status:
+        query = query.where(Prescription.status == status)
+    if patient_id is not None:
+        query = query.where(Appointment.patient_id == patient_id)
+    if date_from:
+        query = query.where(Prescription.created_at >= date_from)
+    if date_to:
+        query = query.where(Prescription.created_at < date_to)
+    result = await db.execute(keyset_page(query, Prescription.created_at, Prescription.id, page))
     
     # Build response with derived fields
     prescription_list = []
-    for prescription in prescriptions:
-        prescription_data = {
-            "id": prescription.id,
-            "appointment_id": prescription.appointment_id,
-            "medications": prescription.medications if isinstance(prescription.medications, list) else [],
-            "ai_summary": prescription.ai_summary,
-            "ai_interactions": prescription.ai_interactions,
-            "status": prescription.status,
-            "pdf_url": prescription.pdf_url,
-            "created_at": prescription.created_at,
-            "patient_email": prescription.appointment.patient.email,
-            "patient_name": prescription.appointment.patient.full_name,
-            "doctor_name": prescription.appointment.doctor.full_name
-        }
+    for row in result.mappings():
+        prescription_data = dict(row)
+        if not isinstance(prescription_data["medications"], list):
+            prescription_data["medications"] = []
         prescription_list.append(prescription_data)
     
-    return prescription_list
+    return finish_page(prescription_list, page, response, "created_at")
 
 
 @router.post("/", response_model=PrescriptionResponse)
 async def create_prescription(
     prescription: PrescriptionCreate,
     current_doctor: User = Depends(get_current_doctor),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     try:
         # Verify appointment exists and belongs to the doctor
-        from app.models.appointment import Appointment
-        appointment = db.query(Appointment).filter(
-            Appointment.id == prescription.appointment_id,
-            Appointment.doctor_id == current_doctor.id
-        ).first()
+        result = await db.execute(
+            select(Appointment).options(selectinload(Appointment.patient)).where(
+                Appointment.id == prescription.appointment_id,
+                Appointment.doctor_id == current_doctor.id
+            )
+        )
+        appointment = result.scalars().first()
         if not appointment:
             raise HTTPException(status_code=404, detail="Appointment not found or access denied")
         
@@ -120,37 +163,40 @@ async def create_prescription(
                 "frequency": med.frequency
             })
         
+        # Keep an analysis the client already ran; otherwise queue one in the background
+        needs_analysis = not prescription.ai_interactions
+        
         # Create prescription
         db_prescription = Prescription(
             appointment_id=prescription.appointment_id,
             medications=medications_list,
             ai_summary=prescription.ai_summary,
-            ai_interactions=prescription.ai_interactions if prescription.ai_interactions else {},
+            ai_interactions=(
+                prescription_analysis.pending_analysis() if needs_analysis
+                else prescription.ai_interactions
+            ),
             status="draft"
         )
         db.add(db_prescription)
-        db.commit()
-        db.refresh(db_prescription)
+        await db.commit()
+        await db.refresh(db_prescription)
         
         # Create share token record
         db_share_token = ShareToken(
             token=share_token,
             prescription_id=db_prescription.id,
-            is_active=True
+            is_active=True,
+            expires_at=(
+                datetime.utcnow() + timedelta(days=settings.SHARE_TOKEN_TTL_DAYS)
+                if settings.SHARE_TOKEN_TTL_DAYS > 0 else None
+            ),
         )
         db.add(db_share_token)
-        db.commit()
-        
-        # Generate QR code
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        share_url = f"http://localhost:3000/share/{share_token}"
-        qr.add_data(share_url)
-        qr.make(fit=True)
+        await db.commit()
+        token_filter.add(share_token)
         
-        img = qr.make_image(fill_color="black", back_color="white")
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        qr_base64 = base64.b64encode(buffer.getvalue()).decode()
+        if needs_analysis:
+            prescription_analysis.enqueue(db_prescription.id)
         
         # Prepare response with derived fields
         response_data = {
@@ -161,7 +207,7 @@ async def create_prescription(
             "ai_interactions": db_prescription.ai_interactions or {},
             "status": db_prescription.status,
             "pdf_url": db_prescription.pdf_url,
-            "qr_code": f"data:image/png;base64,{qr_base64}",
+            "qr_code": _qr_code_url(db_prescription.id),
             "share_token": share_token,
             "created_at": db_prescription.created_at,
             "patient_email": appointment.patient.email if appointment.patient else None,
@@ -181,9 +227,12 @@ async def create_prescription(
 async def get_prescription(
     prescription_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    prescription = db.query(Prescription).filter(Prescription.id == prescription_id).first()
+    result = await db.execute(
+        _with_participants(select(Prescription)).where(Prescription.id == prescription_id)
+    )
+    prescription = result.scalars().first()
     if not prescription:
         raise HTTPException(status_code=404, detail="Prescription not found")
     
@@ -194,27 +243,18 @@ async def get_prescription(
         raise HTTPException(status_code=403, detail="Access forbidden")
     
     # Get share token if exists
-    share_token = db.query(ShareToken).filter(
+    result = await db.execute(select(ShareToken).where(
         ShareToken.prescription_id == prescription_id,
         ShareToken.is_active == True
-    ).first()
+    ))
+    share_token = result.scalars().first()
     
     qr_code = None
     share_token_value = None
     
     if share_token:
-        # Generate QR code
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        share_url = f"http://localhost:3000/share/{share_token.token}"
-        qr.add_data(share_url)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        qr_base64 = base64.b64encode(buffer.getvalue()).decode()
-        
-        qr_code = f"data:image/png;base64,{qr_base64}"
+        # The image itself is served (and cached) by GET /{id}/qr.png
+        qr_code = _qr_code_url(prescription.id)
         share_token_value = share_token.token
     
     # Return prescription with derived fields
@@ -232,4 +272,153 @@ async def get_prescription(
         "patient_email": prescription.appointment.patient.email,
         "patient_name": prescription.appointment.patient.full_name,
         "doctor_name": prescription.appointment.doctor.full_name
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/{prescription_id}/qr.png")
+async def get_prescription_qr(
+    prescription_id: int,
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """QR code for the prescription's active share link, with a strong ETag"""
+    result = await db.execute(
+        select(Appointment.doctor_id, Appointment.patient_id)
+        .join(Prescription, Prescription.appointment_id == Appointment.id)
+        .where(Prescription.id == prescription_id)
+    )
+    participants = result.first()
+    if not participants:
+        raise HTTPException(status_code=404, detail="Prescription not found")
+    
+    # Check access permissions
+    if current_user.role == "doctor" and participants.doctor_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access forbidden")
+    elif current_user.role == "patient" and participants.patient_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access forbidden")
+    
+    result = await db.execute(select(ShareToken.token).where(
+        ShareToken.prescription_id == prescription_id,
+        ShareToken.is_active == True
+    ))
+    token = result.scalars().first()
+    if not token:
+        raise HTTPException(status_code=404, detail="No active share link")
+    
+    image = await qr.get_qr_async(qr.share_url(token))
+    # Revalidate every time so a revoked link stops being served, but allow 304s
+    headers = {"ETag": f'"{image.etag}"', "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, image.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=image.png, media_type="image/png", headers=headers)
+
+
+@router.post("/{prescription_id}/finalize")
+async def finalize_prescription(
+    prescription_id: int,
+    current_doctor: User = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_db),
+):
+    """Finalize a prescription and queue its PDF; pdf_url is filled in once rendered"""
+    result = await db.execute(
+        select(Prescription).options(selectinload(Prescription.appointment))
+        .where(Prescription.id == prescription_id)
+    )
+    prescription = result.scalars().first()
+    if not prescription:
+        raise HTTPException(status_code=404, detail="Prescription not found")
+    if prescription.appointment.doctor_id != current_doctor.id:
+        raise HTTPException(status_code=403, detail="Access forbidden")
+    if prescription.status == PrescriptionStatus.CANCELLED:
+        raise HTTPException(status_code=409, detail="Cancelled prescriptions cannot be finalized")
+    # The PDF is immutable once rendered, so it must include the finished interaction check
+    if (prescription.ai_interactions or {}).get("status") == prescription_analysis.PENDING:
+        raise HTTPException(status_code=409, detail="Interaction analysis is still running; try again shortly")
+    
+    if prescription.status != PrescriptionStatus.FINALIZED:
+        prescription.status = PrescriptionStatus.FINALIZED
+        prescription.finalized_at = datetime.utcnow()
+        prescription.pdf_url = None
+        await db.commit()
+    if prescription.pdf_url is None:
+        prescription_pdf.enqueue(prescription.id)
+    
+    return {
+        "prescription_id": prescription.id,
+        "status": prescription.status,
+        "finalized_at": prescription.finalized_at,
+        "pdf_url": prescription.pdf_url,
+    }
+
+
+@router.get("/{prescription_id}/pdf/{digest}.pdf")
+async def get_prescription_pdf(
+    prescription_id: int,
+    digest: str,
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Serve a rendered PDF artifact; supports Range requests and If-None-Match"""
+    result = await db.execute(
+        select(Prescription.pdf_url, Appointment.doctor_id, Appointment.patient_id)
+        .join(Appointment, Prescription.appointment_id == Appointment.id)
+        .where(Prescription.id == prescription_id)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Prescription not found")
+    
+    # Check access permissions
+    if current_user.role == "doctor" and row.doctor_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access forbidden")
+    elif current_user.role == "patient" and row.patient_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access forbidden")
+    
+    # Only the artifact currently recorded for this prescription is served
+    if prescription_pdf.digest_from_url(row.pdf_url) != digest:
+        raise HTTPException(status_code=404, detail="PDF not found")
+    path = prescription_pdf.artifact_path(digest)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="PDF not found")
+    
+    # Content-addressed, so the digest is a strong validator and the URL never changes
+    headers = {"ETag": f'"{digest}"', "Cache-Control": "private, max-age=31536000, immutable"}
+    if etag_matches(if_none_match, digest):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename=f"prescription-{prescription_id}.pdf",
+        headers=headers,
+    )
+
+
+@router.get("/{prescription_id}/analysis")
+async def get_prescription_analysis(
+    prescription_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Poll the background interaction analysis of a prescription"""
+    result = await db.execute(
+        _with_participants(select(Prescription)).where(Prescription.id == prescription_id)
+    )
+    prescription = result.scalars().first()
+    if not prescription:
+        raise HTTPException(status_code=404, detail="Prescription not found")
+    
+    # Check access permissions
+    if current_user.role == "doctor" and prescription.appointment.doctor_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access forbidden")
+    elif current_user.role == "patient" and prescription.appointment.patient_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access forbidden")
+    
+    ai_interactions = prescription.ai_interactions or {}
+    return {
+        "prescription_id": prescription.id,
+        "status": ai_interactions.get("status", prescription_analysis.COMPLETE),
+        "interactions": ai_interactions.get("interactions", []),
+        "summary": prescription.ai_summary,
+    }
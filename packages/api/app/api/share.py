@@ -1,86 +1,148 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from datetime import datetime
 import json
 from app.db.database import get_db
+from app.core import metrics
+from app.core.config import settings
 from app.core.security import get_current_patient
 from app.models.user import User
+from app.models.appointment import Appointment
 from app.models.prescription import Prescription
 from app.models.share_token import ShareToken
+from app.services import share_access, share_cache, token_filter
+from app.services.cache import MISSING
+from app.services.rate_limit import TokenBucketLimiter, retry_after_header
 
-router = APIRouter()
+_limiter = TokenBucketLimiter(settings.SHARE_RATE_LIMIT_PER_SECOND, settings.SHARE_RATE_LIMIT_BURST)
+metrics.register("share_rate_limit", _limiter.stats)
 
 
-@router.get("/{token}")
-async def get_shared_prescription(
-    token: str,
-    db: Session = Depends(get_db),
-):
-    # Find active share token
-    share_token = db.query(ShareToken).filter(
-        ShareToken.token == token,
-        ShareToken.is_active == True
-    ).first()
-    
-    if not share_token:
-        raise HTTPException(status_code=404, detail="Invalid or expired share token")
-    
-    # Get prescription
-    prescription = db.query(Prescription).filter(
-        Prescription.id == share_token.prescription_id
-    ).first()
-    
-    if not prescription:
-        raise HTTPException(status_code=404, detail="Prescription not found")
-    
-    # Get doctor info
-    doctor = db.query(User).filter(User.id == prescription.doctor_id).first()
-    
+def rate_limit(request: Request) -> None:
+    """Per-client token bucket so scanners cannot crowd out clinicians"""
+    client = request.client.host if request.client else "unknown"
+    retry_after = _limiter.acquire(client)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": retry_after_header(retry_after)},
+        )
+
+
+router = APIRouter(dependencies=[Depends(rate_limit)])
+
+Patient = aliased(User, name="patient")
+Doctor = aliased(User, name="doctor")
+
+# Everything the share page shows, fetched in one joined query
+SHARE_COLUMNS = (
+    ShareToken.expires_at,
+    Prescription.id,
+    Prescription.medications,
+    Prescription.ai_interactions,
+    Prescription.ai_summary,
+    Prescription.created_at,
+    Appointment.reason,
+    Patient.email.label("patient_email"),
+    Doctor.full_name.label("doctor_name"),
+)
+
+
+def _share_payload(row, token: str) -> dict:
     # Convert medications from JSON string if needed
-    medications = prescription.medications
+    medications = row.medications
     if isinstance(medications, str):
         medications = json.loads(medications)
     
-    interactions = prescription.interactions
-    if interactions and isinstance(interactions, str):
-        interactions = json.loads(interactions)
+    ai_interactions = row.ai_interactions or {}
+    interactions = None
+    if ai_interactions.get("interactions") or row.ai_summary:
+        interactions = {
+            "interactions": ai_interactions.get("interactions", []),
+            "summary": row.ai_summary or ai_interactions.get("summary"),
+        }
     
     return {
-        "id": prescription.id,
-        "patient_email": prescription.patient_email,
-        "doctor_name": doctor.username if doctor else "Unknown Doctor",
-        "diagnosis": prescription.diagnosis,
+        "id": row.id,
+        "patient_email": row.patient_email,
+        "doctor_name": row.doctor_name or "Unknown Doctor",
+        "diagnosis": row.reason,
         "medications": medications,
         "interactions": interactions,
-        "created_at": prescription.created_at,
+        "created_at": row.created_at,
         "verification_token": token[:8] + "..." + token[-8:]  # Partial token for verification
     }
 
 
+@router.get("/{token}")
+async def get_shared_prescription(
+    token: str,
+    db: AsyncSession = Depends(get_db),
+):
+    body = share_cache.get(token)
+    if body is MISSING:
+        # Unknown tokens are turned away without a database probe
+        if not await token_filter.might_exist(db, token):
+            raise HTTPException(status_code=404, detail="Invalid or expired share token")
+        
+        result = await db.execute(
+            select(*SHARE_COLUMNS)
+            .join(Prescription, ShareToken.prescription_id == Prescription.id)
+            .join(Appointment, Prescription.appointment_id == Appointment.id)
+            .join(Patient, Appointment.patient_id == Patient.id)
+            .join(Doctor, Appointment.doctor_id == Doctor.id)
+            .where(
+                ShareToken.token == token,
+                ShareToken.is_active == True,
+                # Expired links are refused here even before the sweeper deactivates them
+                or_(ShareToken.expires_at.is_(None), ShareToken.expires_at > datetime.utcnow()),
+            )
+        )
+        row = result.first()
+        if not row:
+            token_filter.record_false_positive()
+            raise HTTPException(status_code=404, detail="Invalid or expired share token")
+        
+        body = json.dumps(jsonable_encoder(_share_payload(row, token))).encode()
+        share_cache.put(token, body, row.expires_at)
+    
+    # Counted in memory and written in batches, keeping scans read-only
+    share_access.record(token)
+    return Response(content=body, media_type="application/json")
+
+
 @router.delete("/prescriptions/{prescription_id}")
 async def revoke_prescription_access(
     prescription_id: int,
     current_patient: User = Depends(get_current_patient),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     # Verify prescription belongs to patient
-    prescription = db.query(Prescription).filter(
-        Prescription.id == prescription_id,
-        Prescription.patient_email == current_patient.email
-    ).first()
-    
-    if not prescription:
+    result = await db.execute(
+        select(Prescription.id)
+        .join(Appointment, Prescription.appointment_id == Appointment.id)
+        .where(Prescription.id == prescription_id, Appointment.patient_id == current_patient.id)
+    )
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Prescription not found or access denied")
     
     # Deactivate all share tokens for this prescription
-    share_tokens = db.query(ShareToken).filter(
+    result = await db.execute(select(ShareToken).where(
         ShareToken.prescription_id == prescription_id,
         ShareToken.is_active == True
-    ).all()
+    ))
+    share_tokens = result.scalars().all()
     
+    now = datetime.utcnow()
     for token in share_tokens:
         token.is_active = False
+        token.revoked_at = now
     
-    db.commit()
+    await db.commit()
+    share_cache.evict(token.token for token in share_tokens)
     
-    return {"message": "Prescription access revoked successfully"}
\ No newline at end of file
+    return {"message": "Prescription access revoked successfully"}
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel
 from app.db.database import get_db
-from app.core.security import get_current_active_user, get_password_hash
+from app.core.pagination import PageParams, finish_page, keyset_page
+from app.core.security import get_current_active_user, hash_password_async
 from app.models.user import User, UserRole
 from app.schemas.user import UserResponse
 
@@ -28,17 +31,44 @@ async def get_user_profile(
     return current_user
 
 
+def _user_page(
+    role: Optional[UserRole],
+    is_active: Optional[bool],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    page: PageParams,
+):
+    """Users oldest first, paged by (created_at, id); date_from/date_to bound created_at"""
+    query = select(User)
+    if role:
+        query = query.where(User.role == role)
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+    if date_from:
+        query = query.where(User.created_at >= date_from)
+    if date_to:
+        query = query.where(User.created_at < date_to)
+    return keyset_page(query, User.created_at, User.id, page, descending=False)
+
+
 @router.get("/", response_model=list[UserResponse])
 async def list_users(
+    response: Response,
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     # Only allow doctors to list users for now
     if current_user.role != "doctor":
         raise HTTPException(status_code=403, detail="Access denied")
     
     try:
-        users = db.query(User).all()
+        result = await db.execute(_user_page(role, is_active, date_from, date_to, page))
+        users = finish_page(result.scalars().all(), page, response, "created_at")
         print(f"Found {len(users)} users in database")
         
         # Filter out users with invalid data that might cause validation errors
@@ -65,6 +95,8 @@ async def list_users(
                 continue
         
         return valid_users
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error listing users: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to list users: {str(e)}")
@@ -73,12 +105,13 @@ async def list_users(
 @router.post("/", response_model=UserResponse)
 async def create_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     print(f"Creating user with data: {user_data}")
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    existing_user = result.scalars().first()
     if existing_user:
         print(f"User already exists: {user_data.email}")
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -92,7 +125,7 @@ async def create_user(
     try:
         db_user = User(
             email=user_data.email,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=await hash_password_async(user_data.password),
             full_name=user_data.full_name,
             role=UserRole.DOCTOR if user_data.role == "doctor" else UserRole.PATIENT,
             license_number=user_data.license_number,
@@ -110,20 +143,20 @@ async def create_user(
         
         print(f"Adding user to database: {db_user.email}")
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         
         print(f"User created successfully: {db_user.id}")
         return db_user
     except Exception as e:
         print(f"Error creating user: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
 
 
 @router.post("/demo-setup")
 async def setup_demo_data(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create demo users and appointments for testing"""
     from app.models.appointment import Appointment
@@ -133,11 +166,12 @@ async def setup_demo_data(
         created_items = []
         
         # Create demo doctor if not exists
-        doctor = db.query(User).filter(User.email == "doctor@demo.com").first()
+        result = await db.execute(select(User).where(User.email == "doctor@demo.com"))
+        doctor = result.scalars().first()
         if not doctor:
             doctor = User(
                 email="doctor@demo.com",
-                hashed_password=get_password_hash("demo123"),
+                hashed_password=await hash_password_async("demo123"),
                 full_name="Dr. Sarah Johnson",
                 role=UserRole.DOCTOR,
                 license_number="MD12345",
@@ -171,11 +205,12 @@ async def setup_demo_data(
         
         created_patients = []
         for patient_data in patients_data:
-            existing_patient = db.query(User).filter(User.email == patient_data["email"]).first()
+            result = await db.execute(select(User).where(User.email == patient_data["email"]))
+            existing_patient = result.scalars().first()
             if not existing_patient:
                 patient = User(
                     email=patient_data["email"],
-                    hashed_password=get_password_hash("demo123"),
+                    hashed_password=await hash_password_async("demo123"),
                     full_name=patient_data["full_name"],
                     role=UserRole.PATIENT,
                     phone_number=patient_data["phone"],
@@ -188,11 +223,11 @@ async def setup_demo_data(
                 created_patients.append(existing_patient)
         
         # Commit users first
-        db.commit()
+        await db.commit()
         
         # Refresh doctor to get ID
         if doctor.id is None:
-            db.refresh(doctor)
+            await db.refresh(doctor)
         
         # Create demo appointments
         appointment_data = [
@@ -224,11 +259,12 @@ async def setup_demo_data(
         
         for apt_data in appointment_data:
             # Check if appointment already exists
-            existing_apt = db.query(Appointment).filter(
+            result = await db.execute(select(Appointment).where(
                 Appointment.patient_id == apt_data["patient"].id,
                 Appointment.doctor_id == doctor.id,
                 Appointment.reason == apt_data["reason"]
-            ).first()
+            ))
+            existing_apt = result.scalars().first()
             
             if not existing_apt:
                 appointment = Appointment(
@@ -241,7 +277,7 @@ async def setup_demo_data(
                 db.add(appointment)
                 created_items.append(f"Appointment: {apt_data['patient'].full_name} - {apt_data['reason']}")
         
-        db.commit()
+        await db.commit()
         
         return {
             "message": "Demo data created successfully!",
@@ -249,18 +285,29 @@ async def setup_demo_data(
             "note": "All demo accounts use password 'demo123' or can be accessed without password via account switcher"
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return {"error": str(e)}
 
 
 @router.get("/demo", response_model=list[UserResponse])
-async def list_demo_users(db: Session = Depends(get_db)):
+async def list_demo_users(
+    response: Response,
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
     """Public endpoint to list ALL users for account switching - NO AUTH REQUIRED"""
     try:
-        # Return ALL users for demo purposes (no authentication required)
-        users = db.query(User).all()
+        # Return ALL users for demo purposes (no authentication required), a page at a time
+        result = await db.execute(_user_page(role, is_active, date_from, date_to, page))
+        users = finish_page(result.scalars().all(), page, response, "created_at")
         print(f"Found {len(users)} users for demo switcher")
         return users
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error listing demo users: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to list demo users: {str(e)}")
\ No newline at end of file
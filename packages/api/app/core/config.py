@@ -6,14 +6,94 @@ from pydantic import field_validator
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./carevault.db"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Server databases only
+    DB_POOL_PRE_PING: bool = True  # Server databases only
+    DB_STATEMENT_CACHE_SIZE: int = 500  # Compiled statements kept per engine / driver connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE_BYTES: int = 268435456  # 256 MB
+    SQLITE_BUSY_TIMEOUT_MS: int = 10000
     
     # Security
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = 300
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4
     
     # API Keys
     OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = ""  # Optional OpenAI-compatible endpoint, e.g. a local fake server
+    
+    # RxNav
+    RXNAV_BASE_URL: str = "https://rxnav.nlm.nih.gov/REST"
+    RXNAV_MAX_CONCURRENCY: int = 8
+    RXNAV_TIMEOUT_SECONDS: float = 5.0
+    RXNAV_CACHE_PATH: str = "./rxnav_cache.db"  # Empty disables the disk tier
+    RXNAV_CACHE_MAX_ENTRIES: int = 10000
+    RXNAV_CACHE_DISK_MAX_ENTRIES: int = 200000
+    RXNAV_CACHE_TTL_SECONDS: int = 604800  # 7 days
+    RXNAV_NEGATIVE_CACHE_TTL_SECONDS: int = 3600
+    RXNAV_CHECK_BUDGET_SECONDS: float = 8.0  # Latency budget for all lookups in one check
+    RXNAV_BREAKER_FAILURE_THRESHOLD: int = 5
+    RXNAV_BREAKER_RESET_SECONDS: float = 30.0
+    RXNAV_HEDGE_DELAY_SECONDS: float = 0.0  # 0 disables hedged requests
+    
+    # Offline interaction index (CSV of pairs or binary index); bypasses RxNav when set
+    INTERACTION_INDEX_PATH: str = ""
+    INTERACTION_INDEX_FALLBACK_ONLY: bool = False  # Only use the index while RxNav is unavailable
+    INTERACTION_BATCH_MAX_ITEMS: int = 10000
+    
+    # Drug name normalization (empty path uses the bundled name list)
+    DRUG_NAMES_PATH: str = ""
+    DRUG_NAME_MIN_SCORE: float = 0.6  # Trigram score for autocomplete suggestions
+    
+    # AI summary cache
+    AI_SUMMARY_CACHE_PATH: str = "./ai_summary_cache.db"  # Empty disables the disk tier
+    AI_SUMMARY_CACHE_MAX_ENTRIES: int = 2000
+    AI_SUMMARY_CACHE_DISK_MAX_ENTRIES: int = 50000
+    AI_SUMMARY_CACHE_TTL_SECONDS: int = 604800  # 7 days
+    
+    # Background prescription analysis
+    AI_ANALYSIS_WORKERS: int = 2
+    AI_ANALYSIS_CLAIM_TTL_SECONDS: int = 600  # A claim older than this is taken over by another worker
+    AI_ANALYSIS_RESCAN_INTERVAL_SECONDS: int = 300  # Re-queue unclaimed pending rows; 0 disables
+    
+    # List endpoints (keyset pagination)
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 500
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per round trip by streaming exports
+    
+    # Share links and QR codes
+    SHARE_BASE_URL: str = "http://localhost:3000/share"
+    QR_CACHE_MAX_ENTRIES: int = 5000
+    QR_CACHE_DIR: str = "./qr_cache"  # Empty disables the disk tier
+    SHARE_CACHE_MAX_ENTRIES: int = 10000
+    SHARE_CACHE_TTL_SECONDS: int = 60
+    SHARE_CACHE_EPOCH_PATH: str = "./share_cache.epoch"  # Shared by workers on one host; empty disables
+    SHARE_ACCESS_FLUSH_SECONDS: float = 5.0  # How often share-link hit counts are written
+    SHARE_RATE_LIMIT_PER_SECOND: float = 5.0  # Per client on the share router
+    SHARE_RATE_LIMIT_BURST: int = 20
+    TOKEN_FILTER_ENABLED: bool = True  # Reject unknown share tokens from memory
+    TOKEN_FILTER_CAPACITY: int = 1000000
+    TOKEN_FILTER_ERROR_RATE: float = 0.001
+    TOKEN_FILTER_EPOCH_PATH: str = "./token_filter.epoch"  # Shared by workers on one host; empty disables
+    SHARE_TOKEN_TTL_DAYS: int = 0  # New share links expire after this many days; 0 never expires
+    SHARE_TOKEN_RETENTION_DAYS: int = 90  # Inactive tokens are archived after this; 0 keeps them
+    SHARE_SWEEP_INTERVAL_SECONDS: float = 60.0
+    SHARE_SWEEP_BATCH_SIZE: int = 1000
+    
+    # Prescription PDFs
+    PDF_ARTIFACT_DIR: str = "./artifacts/pdf"
+    PDF_RENDER_PROCESSES: int = 2
     
     # Server
     HOST: str = "0.0.0.0"
@@ -0,0 +1,13 @@
+from typing import Any, Callable, Dict
+
+# Named collectors reporting point-in-time stats for in-process subsystems
+_collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+    """Register a collector to be included in the /metrics snapshot"""
+    _collectors[name] = collector
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: collector() for name, collector in _collectors.items()}
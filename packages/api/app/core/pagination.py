@@ -0,0 +1,68 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Literal, Optional, Tuple
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select, tuple_
+from app.core.config import settings
+
+# Response header carrying the opaque cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Keyset page request: an opaque cursor from the previous page, a page size and a sort direction"""
+    
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        order: Optional[Literal["asc", "desc"]] = Query(
+            None, description="Sort direction; defaults to the endpoint's own. Pass the same value with every cursor"
+        ),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.order = order
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    payload = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(query: Select, sort_column, id_column, page: PageParams, descending: bool = True) -> Select:
+    """Order by (sort_column, id_column), resume after the cursor and fetch one extra row"""
+    if page.order is not None:
+        descending = page.order == "desc"
+    key = tuple_(sort_column, id_column)
+    if page.cursor:
+        after = tuple_(*decode_cursor(page.cursor))
+        query = query.where(key < after if descending else key > after)
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    return query.limit(page.limit + 1)
+
+
+def finish_page(rows: List[Any], page: PageParams, response: Response, sort_field: str) -> List[Any]:
+    """Trim the look-ahead row and set the next cursor header when more rows remain"""
+    if len(rows) <= page.limit:
+        return rows
+    rows = rows[:page.limit]
+    last = rows[-1]
+    value = last[sort_field] if isinstance(last, dict) else getattr(last, sort_field)
+    row_id = last["id"] if isinstance(last, dict) else last.id
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(value, row_id)
+    return rows
@@ -1,17 +1,28 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import metrics
 from app.core.config import settings
 from app.db.database import get_db
 from app.models.user import User
+from app.services.cache import MISSING, TTLCache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
+# Decoded token -> subject, and subject -> snapshot of the user's columns.
+# Snapshots are dropped whenever a User row is updated or deleted.
+_token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_TOKEN_CACHE_TTL_SECONDS)
+_principal_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -21,6 +32,63 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# bcrypt is CPU-bound, so async handlers hash in a dedicated pool. The
+# semaphore caps concurrent hashes; a login storm queues here instead of
+# occupying every worker thread.
+_hash_executor: Optional[Executor] = None
+_hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+_hash_waiting = 0
+_hash_running = 0
+
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+            )
+    return _hash_executor
+
+
+async def _run_hash(fn, *args):
+    global _hash_waiting, _hash_running
+    _hash_waiting += 1
+    try:
+        await _hash_slots.acquire()
+    finally:
+        _hash_waiting -= 1
+    _hash_running += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        _hash_running -= 1
+        _hash_slots.release()
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password off the event loop"""
+    return await _run_hash(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password off the event loop"""
+    return await _run_hash(verify_password, plain_password, hashed_password)
+
+
+def shutdown_hash_pool() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
+metrics.register("password_hashing", lambda: {"running": _hash_running, "waiting": _hash_waiting})
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -32,26 +100,66 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def _user_snapshot(user: User) -> Dict[str, Any]:
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+
+def invalidate_user(email: str) -> None:
+    """Drop the cached principal for a user"""
+    _principal_cache.delete(email)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    invalidate_user(target.email)
+    # Also drop the entry under the previous email if it was changed
+    for old_email in inspect(target).attrs.email.history.deleted:
+        invalidate_user(old_email)
+
+
+def auth_cache_stats() -> Dict[str, Any]:
+    return {"tokens": _token_cache.stats(), "principals": _principal_cache.stats()}
+
+
+metrics.register("auth_cache", auth_cache_stats)
+
+
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
 ) -> User:
+    """Resolve the bearer token to a User, skipping decode and query on a cache hit.
+    
+    Cached principals are returned as detached ``User`` instances built from
+    a column snapshot, so relationships are not available on them.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+    email = _token_cache.get(token)
+    if email is MISSING:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            email: str = payload.get("sub")
+            if email is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        # Never serve a cached token past its own expiry
+        ttl = min(settings.AUTH_TOKEN_CACHE_TTL_SECONDS, payload["exp"] - time.time())
+        _token_cache.set(token, email, ttl)
     
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    snapshot = _principal_cache.get(email)
+    if snapshot is MISSING:
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
+        if user is None:
+            raise credentials_exception
+        snapshot = _user_snapshot(user)
+        _principal_cache.set(email, snapshot)
+    return User(**snapshot)
 
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
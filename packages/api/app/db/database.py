@@ -1,30 +1,178 @@
-from sqlalchemy import create_engine
+import time
+from pathlib import Path
+from typing import Any, Dict
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core import metrics
 from app.core.config import settings
+from app.services.resilience import LatencyTracker
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Async drivers used by request handlers for each sync URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Map DATABASE_URL onto its async driver, leaving async URLs untouched"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+class PoolMonitor:
+    """Checkout wait times for one engine's connection pool"""
+    
+    def __init__(self):
+        self.waits = LatencyTracker()
+    
+    def timed(self, pool_class: type) -> type:
+        """Subclass a queue pool so every checkout records how long it waited"""
+        monitor = self
+        
+        class TimedPool(pool_class):
+            def _do_get(self):
+                started = time.perf_counter()
+                ok = False
+                try:
+                    connection = super()._do_get()
+                    ok = True
+                    return connection
+                finally:
+                    monitor.waits.record(time.perf_counter() - started, ok)
+        
+        TimedPool.__name__ = f"Timed{pool_class.__name__}"
+        return TimedPool
+    
+    def stats(self, engine: Engine) -> Dict[str, Any]:
+        pool = engine.pool
+        occupancy: Dict[str, Any] = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + settings.DB_MAX_OVERFLOW
+            occupancy.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "occupancy": round(pool.checkedout() / capacity, 3) if capacity else 0.0,
+            })
+        # Timeouts show up as failed checkouts
+        waits = self.waits.stats()
+        waits["timeouts"] = waits.pop("failures")
+        return {**occupancy, "checkout_wait": waits}
+
+
+_url = make_url(settings.DATABASE_URL)
+_async_url = async_database_url(settings.DATABASE_URL)
+_is_sqlite = _url.get_backend_name() == "sqlite"
+_sqlite_memory = _is_sqlite and _url.database in (None, "", ":memory:")
+
+
+def _engine_options(monitor: PoolMonitor, pool_class: type, async_driver: bool = False) -> Dict[str, Any]:
+    """Pool and driver settings for the configured database"""
+    options: Dict[str, Any] = {"query_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    if _is_sqlite:
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            "cached_statements": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+        if _sqlite_memory:
+            # In-memory databases keep the dialect's single-connection pool
+            return options
+    else:
+        options["pool_pre_ping"] = settings.DB_POOL_PRE_PING
+        options["pool_recycle"] = settings.DB_POOL_RECYCLE_SECONDS
+        if async_driver and make_url(_async_url).drivername == "postgresql+asyncpg":
+            options["connect_args"] = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    options.update({
+        "poolclass": monitor.timed(pool_class),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    })
+    return options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Tune every new SQLite connection; WAL lets readers proceed alongside a writer"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_BYTES)}")
+    cursor.close()
+
+
+_sync_pool = PoolMonitor()
+_async_pool = PoolMonitor()
+
+# Sync engine for startup seeding, CLI jobs and background worker threads
+engine = create_engine(settings.DATABASE_URL, **_engine_options(_sync_pool, QueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers
+async_engine = create_async_engine(
+    _async_url,
+    **_engine_options(_async_pool, AsyncAdaptedQueuePool, async_driver=True),
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if _is_sqlite:
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+metrics.register("db_pool", lambda: {
+    "sync": _sync_pool.stats(engine),
+    "async": _async_pool.stats(async_engine.sync_engine),
+})
+
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def close_db() -> None:
+    await async_engine.dispose()
+
+
+# Alembic project (alembic.ini and alembic/) at the API package root
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Revision matching the schema older databases got from create_all
+BASELINE_REVISION = "0001"
+
+
+def run_migrations() -> None:
+    """Upgrade the schema to the latest revision, adopting databases created by create_all"""
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if "alembic_version" not in tables and "users" in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
 
 
 def init_db():
     # Import all models here to ensure they are registered
     from app.models import user, appointment, prescription, share_token
     
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    # Create or upgrade all tables
+    run_migrations()
     
     # Create default users if they don't exist
     from app.core.security import get_password_hash
@@ -1,9 +1,13 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core import metrics
 from app.core.config import settings
-from app.db.database import init_db
-from app.api import auth, users, appointments, prescriptions, ai, share
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import shutdown_hash_pool
+from app.db.database import close_db, init_db
+from app.api import auth, users, appointments, prescriptions, ai, share, export
+from app.services import ai_summary, drug_names, interaction_index, prescription_analysis, prescription_pdf, rxnav, share_access, share_sweeper, token_filter
 
 
 @asynccontextmanager
@@ -11,9 +15,30 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting up CareVault API...")
     init_db()
+    drug_names.load_index()
+    interaction_index.load_index()
+    token_filter.load_filter()
+    rxnav.prune_cache()
+    ai_summary.prune_cache()
+    await rxnav.open_client()
+    await prescription_analysis.start_workers()
+    await prescription_pdf.start_workers()
+    share_access.start_flusher()
+    share_sweeper.start_sweeper()
     yield
     # Shutdown
     print("Shutting down CareVault API...")
+    await prescription_analysis.stop_workers()
+    await prescription_pdf.stop_workers()
+    await share_sweeper.stop_sweeper()
+    await share_access.stop_flusher()
+    await rxnav.close_client()
+    await ai_summary.close_client()
+    rxnav.close_cache()
+    ai_summary.close_cache()
+    interaction_index.close_index()
+    shutdown_hash_pool()
+    await close_db()
 
 
 app = FastAPI(
@@ -30,6 +55,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -39,6 +65,7 @@ app.include_router(appointments.router, prefix="/api/appointments", tags=["Appoi
 app.include_router(prescriptions.router, prefix="/api/prescriptions", tags=["Prescriptions"])
 app.include_router(ai.router, prefix="/api/ai", tags=["AI"])
 app.include_router(share.router, prefix="/api/share", tags=["Share"])
+app.include_router(export.router, prefix="/api/export", tags=["Export"])
 
 
 @app.get("/")
@@ -53,4 +80,9 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "carevault-api"}
\ No newline at end of file
+    return {"status": "healthy", "service": "carevault-api"}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
\ No newline at end of file
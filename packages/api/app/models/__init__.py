@@ -1,6 +1,6 @@
 from app.models.user import User
 from app.models.appointment import Appointment
 from app.models.prescription import Prescription
-from app.models.share_token import ShareToken
+from app.models.share_token import ShareToken, ShareTokenArchive
 
-__all__ = ["User", "Appointment", "Prescription", "ShareToken"]
\ No newline at end of file
+__all__ = ["User", "Appointment", "Prescription", "ShareToken", "ShareTokenArchive"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -13,6 +13,13 @@ class AppointmentStatus(str, enum.Enum):
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Doctor and patient schedules, newest first
+        Index("ix_appointments_doctor_scheduled", "doctor_id", "scheduled_at"),
+        Index("ix_appointments_patient_scheduled", "patient_id", "scheduled_at"),
+        # Incremental exports scan by updated_at watermark
+        Index("ix_appointments_updated", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("users.id"), nullable=False)
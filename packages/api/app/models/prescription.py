@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -14,6 +14,12 @@ class PrescriptionStatus(str, enum.Enum):
 
 class Prescription(Base):
     __tablename__ = "prescriptions"
+    __table_args__ = (
+        # Join from appointments and order by creation time
+        Index("ix_prescriptions_appointment_created", "appointment_id", "created_at"),
+        # Incremental exports scan by updated_at watermark
+        Index("ix_prescriptions_updated", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     appointment_id = Column(Integer, ForeignKey("appointments.id"), nullable=False)
@@ -22,7 +28,7 @@ class Prescription(Base):
     ai_interactions = Column(JSON, nullable=True)
     status = Column(Enum(PrescriptionStatus), default=PrescriptionStatus.DRAFT)
     pdf_url = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     finalized_at = Column(DateTime, nullable=True)
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import secrets
@@ -7,6 +7,14 @@ from app.db.database import Base
 
 class ShareToken(Base):
     __tablename__ = "share_tokens"
+    __table_args__ = (
+        # Active tokens for a prescription
+        Index("ix_share_tokens_prescription_active", "prescription_id", "is_active"),
+        # Workers pull tokens created since their last filter sync
+        Index("ix_share_tokens_created", "created_at"),
+        # The expiry sweeper walks active tokens in expiry order
+        Index("ix_share_tokens_active_expires", "is_active", "expires_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     prescription_id = Column(Integer, ForeignKey("prescriptions.id"), nullable=False)
@@ -23,4 +31,19 @@ class ShareToken(Base):
     
     @staticmethod
     def generate_token():
-        return secrets.token_urlsafe(32)
\ No newline at end of file
+        return secrets.token_urlsafe(32)
+
+
+class ShareTokenArchive(Base):
+    """Inactive share tokens moved out of ``share_tokens`` by the expiry sweeper"""
+    __tablename__ = "share_tokens_archive"
+    
+    id = Column(Integer, primary_key=True)  # Same id the token had in share_tokens
+    prescription_id = Column(Integer, nullable=False)
+    token = Column(String, unique=True, nullable=False)
+    created_at = Column(DateTime)
+    expires_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+    access_count = Column(Integer, default=0)
+    last_accessed_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
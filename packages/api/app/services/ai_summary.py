@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+from openai import AsyncOpenAI
+from app.core import metrics
+from app.core.config import settings
+from app.services.cache import MISSING, SQLiteStore, TieredCache
+from app.services.interaction_index import normalize_drug_name
+
+MODEL = "gpt-4o-mini"
+# Bump whenever the prompt or generation parameters change so that cached
+# summaries produced by the old prompt are no longer served
+PROMPT_VERSION = "1"
+
+SYSTEM_PROMPT = "You are a clinical pharmacist providing drug interaction analysis."
+
+# One async client (and connection pool) per process, closed by the lifespan hook
+_client: Optional[AsyncOpenAI] = None
+
+_store = (
+    SQLiteStore(settings.AI_SUMMARY_CACHE_PATH, settings.AI_SUMMARY_CACHE_DISK_MAX_ENTRIES)
+    if settings.AI_SUMMARY_CACHE_PATH
+    else None
+)
+_summary_cache = TieredCache(
+    "ai_summary",
+    maxsize=settings.AI_SUMMARY_CACHE_MAX_ENTRIES,
+    ttl=settings.AI_SUMMARY_CACHE_TTL_SECONDS,
+    negative_ttl=0,
+    store=_store,
+)
+
+
+def get_client() -> Optional[AsyncOpenAI]:
+    """Return the shared async OpenAI client, or None when no key is configured"""
+    global _client
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if not openai_api_key:
+        return None
+    if _client is None:
+        _client = AsyncOpenAI(
+            api_key=openai_api_key,
+            base_url=settings.OPENAI_BASE_URL or None,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def prune_cache() -> None:
+    """Drop expired and excess rows from the on-disk summary cache"""
+    if _store is not None:
+        removed = _store.prune()
+        print(f"Pruned {removed} AI summary cache entries")
+
+
+def close_cache() -> None:
+    if _store is not None:
+        _store.close()
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _summary_cache.stats()
+
+
+metrics.register("ai_summary_cache", cache_stats)
+
+
+def summary_cache_key(medications: List[str], interaction_pairs: List[str]) -> str:
+    """Canonical hash of the medication set, detected pairs and prompt version"""
+    canonical = {
+        "model": MODEL,
+        "prompt_version": PROMPT_VERSION,
+        "medications": sorted({normalize_drug_name(name) for name in medications}),
+        "interaction_pairs": sorted(normalize_drug_name(pair) for pair in interaction_pairs),
+    }
+    encoded = json.dumps(canonical, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def build_prompt(medications: List[str], interaction_pairs: List[str]) -> str:
+    known_interactions = (
+        f"Known interactions from RxNav: {', '.join(interaction_pairs)}" if interaction_pairs else ""
+    )
+    return f"""You are a clinical pharmacist. Analyze the following medications for potential interactions. Your summary will be shared with both healthcare professionals and patients, so it should be informative, accurate, and easy to understand.
+
+Medications: {', '.join(medications)}
+{known_interactions}
+
+Please provide:
+1. A clear explanation of any significant drug interactions, using simple language for patients but including clinical details for doctors.
+2. The severity of any interactions (if any), and what symptoms or side effects to watch for.
+3. Practical advice for both patients and clinicians (e.g., when to seek help, possible alternatives, or monitoring tips).
+
+Keep the summary concise, friendly, and actionable. Avoid medical jargon where possible, and explain any necessary terms."""
+
+
+def basic_summary(medications: List[str], interaction_pairs: List[str]) -> str:
+    """Summary used when OpenAI is not configured or fails"""
+    if interaction_pairs:
+        return f"Potential interactions detected between: {', '.join(interaction_pairs)}. Please review these combinations carefully and consider alternative medications if necessary."
+    return f"No significant interactions detected between the {len(medications)} medications. However, always consider patient-specific factors and monitor for adverse effects."
+
+
+def _completion_args(medications: List[str], interaction_pairs: List[str]) -> Dict[str, Any]:
+    return {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": build_prompt(medications, interaction_pairs)}
+        ],
+        "max_tokens": 300,
+        "temperature": 0.3,
+    }
+
+
+async def generate_summary(medications: List[str], interaction_pairs: List[str]) -> Optional[str]:
+    """Return an OpenAI summary, served from the summary cache when possible.
+    
+    Returns None when no API key is configured or the completion fails or
+    comes back empty; empty completions are never cached.
+    """
+    client = get_client()
+    if client is None:
+        return None
+    
+    key = summary_cache_key(medications, interaction_pairs)
+    cached = await _summary_cache.get(key)
+    if cached is not MISSING:
+        return cached
+    
+    try:
+        response = await client.chat.completions.create(
+            **_completion_args(medications, interaction_pairs)
+        )
+        summary = (response.choices[0].message.content or "").strip()
+    except Exception as e:
+        print(f"OpenAI API error: {e}")
+        return None
+    
+    if not summary:
+        print("OpenAI API returned an empty summary")
+        return None
+    
+    await _summary_cache.set(key, summary)
+    return summary
+
+
+async def stream_summary(medications: List[str], interaction_pairs: List[str]) -> AsyncIterator[str]:
+    """Yield summary text as it is generated.
+    
+    Cached summaries are yielded in one piece. Without OpenAI, or if the
+    completion fails or ends before producing any text, the basic summary is
+    yielded instead; only non-empty summaries are cached.
+    """
+    client = get_client()
+    key = summary_cache_key(medications, interaction_pairs)
+    if client is not None:
+        cached = await _summary_cache.get(key)
+        if cached is not MISSING:
+            yield cached
+            return
+    
+    chunks: List[str] = []
+    if client is not None:
+        try:
+            stream = await client.chat.completions.create(
+                **_completion_args(medications, interaction_pairs), stream=True
+            )
+            async for chunk in stream:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    # Drop leading whitespace to match the non-streaming summary
+                    if not chunks:
+                        text = text.lstrip()
+                        if not text:
+                            continue
+                    chunks.append(text)
+                    yield text
+            if chunks:
+                await _summary_cache.set(key, "".join(chunks).strip())
+                return
+            print("OpenAI API returned an empty summary")
+        except Exception as e:
+            print(f"OpenAI API error: {e}")
+            if chunks:
+                return
+    
+    yield basic_summary(medications, interaction_pairs)
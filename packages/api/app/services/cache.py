@@ -0,0 +1,315 @@
+import asyncio
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Sentinel returned on a miss so that cached ``None`` values (negative
+# caching) can be told apart from absent entries
+MISSING = object()
+
+
+class TTLCache:
+    """In-process LRU cache with per-entry TTL and hit/miss counters"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class SQLiteStore:
+    """Persistent namespaced key/value store backed by a local SQLite file.
+    
+    Values are JSON-encoded. Entries past their expiry are treated as misses
+    and removed by ``prune``, which also trims each namespace to
+    ``max_entries`` rows, oldest first.
+    """
+    
+    def __init__(self, path: str, max_entries: int = 100_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )"""
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+    
+    def get(self, namespace: str, key: str, allow_expired: bool = False) -> Any:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None or (row[1] <= time.time() and not allow_expired):
+            return MISSING
+        return json.loads(row[0])
+    
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), now, now + ttl),
+            )
+            conn.commit()
+    
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            )
+            conn.commit()
+    
+    def prune(self) -> int:
+        """Drop expired rows and trim every namespace to max_entries"""
+        with self._lock:
+            conn = self._connect()
+            removed = conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            namespaces = [row[0] for row in conn.execute("SELECT DISTINCT namespace FROM cache_entries")]
+            for namespace in namespaces:
+                removed += conn.execute(
+                    """DELETE FROM cache_entries WHERE namespace = ? AND key NOT IN (
+                        SELECT key FROM cache_entries WHERE namespace = ?
+                        ORDER BY stored_at DESC LIMIT ?
+                    )""",
+                    (namespace, namespace, self.max_entries),
+                ).rowcount
+            conn.commit()
+        return removed
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class TieredCache:
+    """Memory LRU in front of an optional persistent SQLiteStore.
+    
+    ``None`` values are cached as negative entries with ``negative_ttl`` so
+    repeated lookups of unknown keys are answered without going upstream.
+    """
+    
+    def __init__(
+        self,
+        namespace: str,
+        maxsize: int,
+        ttl: float,
+        negative_ttl: float,
+        store: Optional[SQLiteStore] = None,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory = TTLCache(maxsize, ttl)
+        self.store = store
+        self.disk_hits = 0
+        self.misses = 0
+    
+    async def get(self, key: str, allow_stale: bool = False) -> Any:
+        """Look up ``key``; ``allow_stale`` also accepts expired disk entries"""
+        value = self.memory.get(key)
+        if value is not MISSING:
+            return value
+        if self.store is not None:
+            value = await asyncio.to_thread(self.store.get, self.namespace, key, allow_stale)
+            if value is not MISSING:
+                self.disk_hits += 1
+                self.memory.set(key, value, self._ttl_for(value))
+                return value
+        self.misses += 1
+        return MISSING
+    
+    async def set(self, key: str, value: Any) -> None:
+        ttl = self._ttl_for(value)
+        self.memory.set(key, value, ttl)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, self.namespace, key, value, ttl)
+    
+    def _ttl_for(self, value: Any) -> float:
+        return self.negative_ttl if value is None else self.ttl
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+_COUNTER = struct.Struct("<Q")
+_COUNTER_LIMIT = 1 << 64
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+
+def _read_counter(fd: int) -> int:
+    os.lseek(fd, 0, os.SEEK_SET)
+    data = os.read(fd, _COUNTER.size)
+    return _COUNTER.unpack(data)[0] if len(data) == _COUNTER.size else 0
+
+
+@contextmanager
+def _exclusive(fd: int) -> Iterator[None]:
+    """Hold an exclusive lock on an epoch file across processes"""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        return
+    # Windows locks are mandatory, so lock a byte past the counter to keep reads unblocked
+    os.lseek(fd, _COUNTER.size, os.SEEK_SET)
+    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+    try:
+        yield
+    finally:
+        os.lseek(fd, _COUNTER.size, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileEpoch:
+    """Cross-process change signal for caches shared by several workers on one host.
+    
+    The signal is a 64-bit counter stored in a small file: writers ``bump``
+    it with a read-increment-write under an exclusive lock, so concurrent
+    bumps never collapse and the file never grows, and readers call
+    ``changed`` (one unlocked 8-byte read) and drop their in-process entries
+    when it moves. A writer only skips its own bump when no other bump
+    landed since it last looked. An empty path disables the signal for
+    single-process deployments.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._seen: Optional[int] = self._read() if path else None
+        self.bumps = 0
+        self.changes = 0
+    
+    def _read(self) -> int:
+        try:
+            fd = os.open(self.path, os.O_RDONLY | _O_BINARY)
+        except FileNotFoundError:
+            return 0
+        try:
+            return _read_counter(fd)
+        finally:
+            os.close(fd)
+    
+    def bump(self) -> None:
+        if not self.path:
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | _O_BINARY, 0o644)
+        try:
+            with _exclusive(fd):
+                before = _read_counter(fd)
+                after = (before + 1) % _COUNTER_LIMIT
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, _COUNTER.pack(after))
+                # Files from the older append-only format shrink back to the counter
+                os.ftruncate(fd, _COUNTER.size)
+        finally:
+            os.close(fd)
+        # Anything else between our last look and our bump stays pending for ``changed``
+        if before == self._seen:
+            self._seen = after
+        self.bumps += 1
+    
+    def changed(self) -> bool:
+        if not self.path:
+            return False
+        # An unlocked read racing a bump can at worst report the change one call late
+        current = self._read()
+        if current == self._seen:
+            return False
+        self._seen = current
+        self.changes += 1
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"bumps": self.bumps, "changes": self.changes}
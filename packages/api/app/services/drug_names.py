@@ -0,0 +1,199 @@
+"""Local drug-name normalization and fuzzy matching.
+
+Free-text names are cleaned (case, strength suffixes, dosage forms, salt
+names) and resolved against a bundled RxNorm-style name list mapping
+generic and brand names to a canonical generic name and, where known, its
+RxCUI. Combination products ("amlodipine/benazepril") are split into their
+ingredients.
+
+Resolution for interaction checks is exact after normalization: a trigram
+score cannot tell a misspelling from a different drug with a similar name
+(ampicillin/amoxicillin, hydrocortisone/hydrocodone), so unknown names are
+passed on unchanged. Fuzzy trigram matching only powers autocomplete.
+"""
+import bisect
+import csv
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from app.core import metrics
+from app.core.config import settings
+
+BUNDLED_NAMES_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "drug_names.csv")
+
+_STRENGTH = re.compile(
+    # Combination strengths such as "5/10 mg" are one strength
+    r"\b\d+(?:\.\d+)?(?:\s*/\s*\d+(?:\.\d+)?)*\s*(?:mg|mcg|µg|g|ml|units?|iu|meq|%)"
+    r"(?:/\s*(?:\d+(?:\.\d+)?\s*)?(?:ml|l|hr?|kg|m2|dose|actuation|spray))?(?=[\s/+]|$)",
+    re.IGNORECASE,
+)
+# Separators between the ingredients of a combination product
+_COMBINATION = re.compile(r"\s*[/+]\s*")
+_DOSAGE_FORMS = {
+    "tablet", "tablets", "tab", "tabs", "capsule", "capsules", "cap", "caps", "oral",
+    "solution", "suspension", "injection", "injectable", "cream", "ointment", "patch",
+    "er", "xr", "sr", "dr", "cr", "la", "ec", "extended", "release", "delayed", "chewable",
+}
+# Salt names dropped when they trail an ingredient, e.g. "losartan potassium"
+_SALTS = {
+    "hcl", "hydrochloride", "sodium", "potassium", "calcium", "tartrate", "succinate",
+    "besylate", "maleate", "mesylate", "citrate", "sulfate", "phosphate", "magnesium",
+}
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip strengths, dosage forms and trailing salt names"""
+    text = _STRENGTH.sub(" ", text.lower())
+    tokens = [t for t in re.split(r"[^a-z0-9\-]+", text) if t and t not in _DOSAGE_FORMS]
+    while len(tokens) > 1 and tokens[-1] in _SALTS:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def split_ingredients(text: str) -> List[str]:
+    """Ingredients of a combination product such as "amlodipine/benazepril", as typed"""
+    text = _STRENGTH.sub(" ", text)
+    return [" ".join(part.split()) for part in _COMBINATION.split(text) if normalize(part)]
+
+
+def _trigrams(text: str) -> List[str]:
+    padded = f"  {text} "
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+@dataclass(frozen=True)
+class DrugMatch:
+    name: str
+    canonical: str
+    rxcui: Optional[str]
+    score: float
+
+
+class DrugNameIndex:
+    """Exact, prefix and trigram lookups over a drug name list"""
+    
+    def __init__(self, entries: List[tuple]):
+        # entries: (name, canonical, rxcui), names already normalized
+        self.entries = entries
+        self._exact: Dict[str, int] = {}
+        self._trigrams: Dict[str, List[int]] = {}
+        for entry_id, (name, _, _) in enumerate(entries):
+            self._exact.setdefault(name, entry_id)
+            for gram in _trigrams(name):
+                self._trigrams.setdefault(gram, []).append(entry_id)
+        self._sorted_names = sorted((name, entry_id) for entry_id, (name, _, _) in enumerate(entries))
+    
+    @classmethod
+    def from_csv(cls, path: str) -> "DrugNameIndex":
+        """Load ``name,canonical[,rxcui]`` rows; ``#`` lines are comments"""
+        entries = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                    continue
+                name = normalize(row[0])
+                canonical = normalize(row[1]) if len(row) > 1 and row[1].strip() else name
+                rxcui = row[2].strip() if len(row) > 2 and row[2].strip() else None
+                entries.append((name, canonical, rxcui))
+        return cls(entries)
+    
+    def _match(self, entry_id: int, score: float) -> DrugMatch:
+        name, canonical, rxcui = self.entries[entry_id]
+        return DrugMatch(name=name, canonical=canonical, rxcui=rxcui, score=score)
+    
+    def _fuzzy(self, query: str, limit: int, min_score: float) -> List[DrugMatch]:
+        grams = _trigrams(query)
+        overlap: Counter = Counter()
+        for gram in grams:
+            overlap.update(self._trigrams.get(gram, ()))
+        scored = []
+        for entry_id, shared in overlap.items():
+            name = self.entries[entry_id][0]
+            # Dice coefficient over trigram sets
+            score = 2 * shared / (len(grams) + len(name) + 1)
+            if score >= min_score:
+                scored.append((score, name, entry_id))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self._match(entry_id, round(score, 3)) for score, _, entry_id in scored[:limit]]
+    
+    def resolve(self, text: str) -> Optional[DrugMatch]:
+        """Exact match for a normalized free-text name, or None when it is not in the list"""
+        entry_id = self._exact.get(normalize(text))
+        return self._match(entry_id, 1.0) if entry_id is not None else None
+    
+    def complete(self, prefix: str, limit: int = 10) -> List[DrugMatch]:
+        """Names starting with ``prefix``, topped up with fuzzy matches"""
+        query = normalize(prefix)
+        if not query:
+            return []
+        results: List[DrugMatch] = []
+        seen = set()
+        position = bisect.bisect_left(self._sorted_names, (query, -1))
+        while position < len(self._sorted_names) and len(results) < limit:
+            name, entry_id = self._sorted_names[position]
+            if not name.startswith(query):
+                break
+            results.append(self._match(entry_id, 1.0))
+            seen.add(entry_id)
+            position += 1
+        if len(results) < limit:
+            for match in self._fuzzy(query, limit, settings.DRUG_NAME_MIN_SCORE / 2):
+                entry_id = self._exact[match.name]
+                if entry_id not in seen and len(results) < limit:
+                    results.append(match)
+                    seen.add(entry_id)
+        return results
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+_index: Optional[DrugNameIndex] = None
+_resolved = 0
+_unresolved = 0
+
+
+def load_index() -> DrugNameIndex:
+    """Load the drug name list configured by DRUG_NAMES_PATH (bundled by default)"""
+    global _index
+    if _index is None:
+        _index = DrugNameIndex.from_csv(settings.DRUG_NAMES_PATH or BUNDLED_NAMES_PATH)
+    return _index
+
+
+def resolve(text: str) -> Optional[DrugMatch]:
+    global _resolved, _unresolved
+    match = load_index().resolve(text)
+    if match is None:
+        _unresolved += 1
+    else:
+        _resolved += 1
+    return match
+
+
+def canonical_name(text: str) -> str:
+    """Canonical generic name for ``text``, or its normalized form if unknown"""
+    match = resolve(text)
+    return match.canonical if match is not None else normalize(text)
+
+
+def ingredient_names(text: str) -> List[str]:
+    """Canonical name of each ingredient in ``text``"""
+    return list(dict.fromkeys(canonical_name(part) for part in split_ingredients(text)))
+
+
+def complete(prefix: str, limit: int = 10) -> List[DrugMatch]:
+    return load_index().complete(prefix, limit)
+
+
+def stats() -> Dict[str, int]:
+    return {
+        "names": len(_index) if _index is not None else 0,
+        "resolved": _resolved,
+        "unresolved": _unresolved,
+    }
+
+
+metrics.register("drug_names", stats)
@@ -0,0 +1,300 @@
+"""Stream appointments and prescriptions for analytics extracts.
+
+Rows are read through a server-side cursor (``yield_per``) and written one at
+a time as NDJSON or CSV, so memory stays flat regardless of table size.
+Incremental extracts pass the previous run's watermark (the largest
+``updated_at`` seen) as ``since``; rows updated at exactly the watermark are
+sent again, so consumers should upsert by ``id``.
+
+``stream_history_zip`` builds a patient's prescription PDFs into a ZIP the
+same way, one chunk at a time, reusing rendered PDF artifacts. PDFs are
+already compressed, so they are stored rather than deflated, and file reads
+run in a worker thread so a large export never stalls the event loop.
+    
+    python -m app.services.export prescriptions --format csv \\
+        --watermark-file prescriptions.watermark > prescriptions.csv
+"""
+import argparse
+import asyncio
+import csv
+import enum
+import hashlib
+import io
+import json
+import sys
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.appointment import Appointment
+from app.models.prescription import Prescription, PrescriptionStatus
+from app.services import prescription_pdf
+
+FORMATS = ("ndjson", "csv")
+COPY_CHUNK_SIZE = 65536  # Bytes of a stored PDF copied per worker-thread hop
+
+# Exported columns per dataset, in output order
+COLUMNS = {
+    "appointments": (
+        Appointment.id,
+        Appointment.patient_id,
+        Appointment.doctor_id,
+        Appointment.scheduled_at,
+        Appointment.status,
+        Appointment.reason,
+        Appointment.notes,
+        Appointment.created_at,
+        Appointment.updated_at,
+    ),
+    "prescriptions": (
+        Prescription.id,
+        Prescription.appointment_id,
+        Appointment.patient_id,
+        Appointment.doctor_id,
+        Prescription.status,
+        Prescription.medications,
+        Prescription.ai_summary,
+        Prescription.ai_interactions,
+        Prescription.pdf_url,
+        Prescription.created_at,
+        Prescription.updated_at,
+        Prescription.finalized_at,
+    ),
+}
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def column_names(dataset: str) -> List[str]:
+    return [column.key for column in COLUMNS[dataset]]
+
+
+def export_query(dataset: str, since: Optional[datetime] = None, doctor_id: Optional[int] = None) -> Select:
+    """Rows of ``dataset`` updated at or after ``since``, in watermark order"""
+    model = Prescription if dataset == "prescriptions" else Appointment
+    query = select(*COLUMNS[dataset])
+    if model is Prescription:
+        query = query.join(Appointment, Prescription.appointment_id == Appointment.id)
+    if since is not None:
+        query = query.where(model.updated_at >= since)
+    if doctor_id is not None:
+        query = query.where(Appointment.doctor_id == doctor_id)
+    return query.order_by(model.updated_at, model.id).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _record(row) -> Dict[str, Any]:
+    return {key: _plain(value) for key, value in row._mapping.items()}
+
+
+def ndjson_line(row) -> str:
+    return json.dumps(_record(row)) + "\n"
+
+
+class CSVEncoder:
+    """Encode rows as CSV lines, starting with a header; JSON columns are embedded as JSON text"""
+    
+    def __init__(self, dataset: str):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self.header = self._line(column_names(dataset))
+    
+    def _line(self, values: Iterable[Any]) -> str:
+        self._writer.writerow(values)
+        line = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return line
+    
+    def encode(self, row) -> str:
+        values = []
+        for value in _record(row).values():
+            values.append(json.dumps(value) if isinstance(value, (dict, list)) else value)
+        return self._line(values)
+
+
+def encode_rows(rows: Iterable, dataset: str, fmt: str) -> Iterator[str]:
+    if fmt == "csv":
+        encoder = CSVEncoder(dataset)
+        yield encoder.header
+        for row in rows:
+            yield encoder.encode(row)
+    else:
+        for row in rows:
+            yield ndjson_line(row)
+
+
+async def encode_rows_async(rows: AsyncIterator, dataset: str, fmt: str) -> AsyncIterator[str]:
+    if fmt == "csv":
+        encoder = CSVEncoder(dataset)
+        yield encoder.header
+        async for row in rows:
+            yield encoder.encode(row)
+    else:
+        async for row in rows:
+            yield ndjson_line(row)
+
+
+async def stream_export(
+    db: AsyncSession, dataset: str, fmt: str, since: Optional[datetime] = None, doctor_id: Optional[int] = None
+) -> AsyncIterator[str]:
+    """Encoded export lines for request handlers, fetched in batches of EXPORT_BATCH_SIZE"""
+    result = await db.stream(export_query(dataset, since, doctor_id))
+    async for line in encode_rows_async(result, dataset, fmt):
+        yield line
+
+
+def write_export(db: Session, dataset: str, fmt: str, out, since: Optional[datetime] = None) -> Optional[datetime]:
+    """Write an export to ``out`` and return the new watermark (largest updated_at written)"""
+    watermark = since
+    
+    def rows():
+        nonlocal watermark
+        for row in db.execute(export_query(dataset, since)):
+            if row.updated_at is not None and (watermark is None or row.updated_at > watermark):
+                watermark = row.updated_at
+            yield row
+    
+    for line in encode_rows(rows(), dataset, fmt):
+        out.write(line)
+    return watermark
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable sink for ZipFile; zipfile then streams entries with data descriptors"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _copy_chunk(source, entry, checksum) -> bool:
+    """Copy the next chunk of an artifact into the open ZIP entry; False at end of file"""
+    chunk = source.read(COPY_CHUNK_SIZE)
+    if not chunk:
+        return False
+    entry.write(chunk)
+    checksum.update(chunk)
+    return True
+
+
+def history_query(patient_id: int, doctor_id: Optional[int] = None) -> Select:
+    query = (
+        select(Prescription.id, Prescription.status, Prescription.pdf_url, Prescription.created_at)
+        .join(Appointment, Prescription.appointment_id == Appointment.id)
+        .where(Appointment.patient_id == patient_id)
+    )
+    if doctor_id is not None:
+        query = query.where(Appointment.doctor_id == doctor_id)
+    return query.order_by(Prescription.created_at, Prescription.id)
+
+
+async def _prescription_pdf(prescription_id: int, status, pdf_url: Optional[str]) -> Optional[str]:
+    """Path of an existing artifact, rendering (and storing) finalized prescriptions that lack one"""
+    digest = prescription_pdf.digest_from_url(pdf_url)
+    if digest is None and status == PrescriptionStatus.FINALIZED:
+        digest = await prescription_pdf.ensure_pdf(prescription_id)
+    if digest is None:
+        return None
+    path = prescription_pdf.artifact_path(digest)
+    return path if Path(path).exists() else None
+
+
+async def stream_history_zip(db: AsyncSession, patient_id: int, doctor_id: Optional[int] = None) -> AsyncIterator[bytes]:
+    """ZIP of a patient's prescription PDFs, yielded as each piece is written.
+    
+    Stored artifacts are copied in chunks off the event loop; drafts are
+    rendered on the fly and not stored, since they may still change. A
+    manifest.json closes the archive.
+    """
+    sink = _ChunkSink()
+    manifest = []
+    # Only ids and pointers are held; no read transaction stays open while the archive streams
+    result = await db.execute(history_query(patient_id, doctor_id))
+    rows = result.all()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for prescription_id, status, pdf_url, created_at in rows:
+            name = f"prescription-{prescription_id}.pdf"
+            info = zipfile.ZipInfo(name, date_time=(created_at or datetime.utcnow()).timetuple()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            checksum = hashlib.sha256()
+            path = await _prescription_pdf(prescription_id, status, pdf_url)
+            with archive.open(info, "w") as entry:
+                if path is not None:
+                    source = await asyncio.to_thread(open, path, "rb")
+                    try:
+                        while await asyncio.to_thread(_copy_chunk, source, entry, checksum):
+                            yield sink.drain()
+                    finally:
+                        source.close()
+                else:
+                    document = await asyncio.to_thread(prescription_pdf.load_document, prescription_id)
+                    pdf = await prescription_pdf.render_bytes(document)
+                    entry.write(pdf)
+                    checksum.update(pdf)
+            yield sink.drain()
+            manifest.append({
+                "id": prescription_id,
+                "file": name,
+                "status": _plain(status),
+                "created_at": _plain(created_at),
+                "sha256": checksum.hexdigest(),
+            })
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+    yield sink.drain()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export appointments or prescriptions as NDJSON or CSV")
+    parser.add_argument("dataset", choices=sorted(COLUMNS))
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only rows updated at or after this time")
+    parser.add_argument(
+        "--watermark-file",
+        type=Path,
+        help="Read --since from this file when present and store the new watermark after a successful export",
+    )
+    args = parser.parse_args(argv)
+    
+    since = args.since
+    if since is None and args.watermark_file and args.watermark_file.exists():
+        text = args.watermark_file.read_text().strip()
+        since = datetime.fromisoformat(text) if text else None
+    
+    db = SessionLocal()
+    try:
+        watermark = write_export(db, args.dataset, args.format, sys.stdout, since)
+    finally:
+        db.close()
+    sys.stdout.flush()
+    
+    if args.watermark_file and watermark is not None:
+        args.watermark_file.write_text(watermark.isoformat() + "\n")
+    print(f"Exported {args.dataset}; watermark {watermark.isoformat() if watermark else 'unchanged'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
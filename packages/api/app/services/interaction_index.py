@@ -0,0 +1,222 @@
+"""Offline drug-interaction index.
+
+Interactions are stored as unordered pairs of normalized drug names. Each
+name is mapped to a small integer id and each pair to a single 64-bit key,
+so a pair check is one hash probe. Lookups use canonical generic names, so
+datasets keyed by RxCUI are rejected at load time rather than silently
+matching nothing.
+
+The index can be loaded from a CSV of pairs or from a prebuilt binary file
+that is memory-mapped and probed in place. Build the binary file with:
+
+    python -m app.services.interaction_index build pairs.csv interactions.idx
+"""
+import argparse
+import csv
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.core.config import settings
+
+MAGIC = b"CVII"
+VERSION = 1
+# magic, version, vocabulary byte length, hash table slot count
+HEADER = struct.Struct("<4sIQQ")
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+def normalize_drug_name(name: str) -> str:
+    return " ".join(name.strip().lower().split())
+
+
+def _pair_key(id_a: int, id_b: int) -> int:
+    if id_a > id_b:
+        id_a, id_b = id_b, id_a
+    return (id_a << 32) | id_b
+
+
+def _slot(key: int, bits: int) -> int:
+    # Fibonacci hashing: the top ``bits`` bits of key * golden ratio
+    return ((key * _HASH_MULTIPLIER) & _MASK64) >> (64 - bits)
+
+
+class InteractionIndex:
+    """Constant-time lookup of known interacting drug pairs"""
+    
+    def __init__(self, vocabulary: Dict[str, int], pairs: Optional[Set[int]] = None, table=None, mapped=None):
+        numeric = next((name for name in vocabulary if name.isdigit()), None)
+        if numeric is not None:
+            if mapped is not None:
+                table.release()
+                mapped.close()
+            raise ValueError(
+                f"Interaction index entry {numeric!r} looks like an RxCUI; "
+                "the offline index must be keyed by drug name"
+            )
+        self.vocabulary = vocabulary
+        self._pairs = pairs
+        self._table = table
+        self._mapped = mapped
+        self._bits = (len(table) - 1).bit_length() if table is not None else 0
+    
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, str]]) -> "InteractionIndex":
+        vocabulary: Dict[str, int] = {}
+        keys: Set[int] = set()
+        for drug_a, drug_b in pairs:
+            ids = []
+            for name in (drug_a, drug_b):
+                name = normalize_drug_name(name)
+                # Ids start at 1 so that a zero slot always means "empty"
+                ids.append(vocabulary.setdefault(name, len(vocabulary) + 1))
+            keys.add(_pair_key(*ids))
+        return cls(vocabulary, pairs=keys)
+    
+    @classmethod
+    def from_csv(cls, path: str) -> "InteractionIndex":
+        """Load ``drug_a,drug_b`` rows; blank lines and ``#`` comments are skipped"""
+        def rows():
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.reader(f):
+                    if len(row) < 2 or not row[0].strip() or row[0].lstrip().startswith("#"):
+                        continue
+                    yield row[0], row[1]
+        return cls.from_pairs(rows())
+    
+    @classmethod
+    def from_binary(cls, path: str) -> "InteractionIndex":
+        """Memory-map a prebuilt index; the hash table is probed in place"""
+        if sys.byteorder != "little":
+            raise ValueError("Binary interaction indexes require a little-endian host")
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, vocab_len, slots = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != VERSION:
+            mapped.close()
+            raise ValueError(f"{path} is not a CareVault interaction index")
+        vocab_start = HEADER.size
+        vocabulary = json.loads(mapped[vocab_start:vocab_start + vocab_len])
+        table_start = vocab_start + vocab_len
+        table = memoryview(mapped)[table_start:table_start + slots * 8].cast("Q")
+        return cls(vocabulary, table=table, mapped=mapped)
+    
+    @classmethod
+    def load(cls, path: str) -> "InteractionIndex":
+        with open(path, "rb") as f:
+            is_binary = f.read(len(MAGIC)) == MAGIC
+        return cls.from_binary(path) if is_binary else cls.from_csv(path)
+    
+    def _contains(self, key: int) -> bool:
+        if self._pairs is not None:
+            return key in self._pairs
+        table = self._table
+        mask = len(table) - 1
+        slot = _slot(key, self._bits)
+        while True:
+            stored = table[slot]
+            if stored == 0:
+                return False
+            if stored == key:
+                return True
+            slot = (slot + 1) & mask
+    
+    def interacts(self, drug_a: str, drug_b: str) -> bool:
+        id_a = self.vocabulary.get(normalize_drug_name(drug_a))
+        id_b = self.vocabulary.get(normalize_drug_name(drug_b))
+        if id_a is None or id_b is None:
+            return False
+        return self._contains(_pair_key(id_a, id_b))
+    
+    def interacting_positions(self, names: List[str]) -> List[Tuple[int, int]]:
+        """Return ``(i, j)`` positions, i < j, of every interacting pair in ``names``"""
+        ids = [self.vocabulary.get(normalize_drug_name(name)) for name in names]
+        positions = []
+        for i, id_a in enumerate(ids):
+            if id_a is None:
+                continue
+            for j in range(i + 1, len(ids)):
+                id_b = ids[j]
+                if id_b is not None and self._contains(_pair_key(id_a, id_b)):
+                    positions.append((i, j))
+        return positions
+    
+    def interacting_pairs(self, medications: List[str]) -> List[Tuple[str, str]]:
+        """Return every interacting (drug1, drug2) pair in list order"""
+        return [(medications[i], medications[j]) for i, j in self.interacting_positions(medications)]
+    
+    def write_binary(self, path: str) -> None:
+        """Write an open-addressing hash table of pair keys at <=50% load"""
+        keys = self._pairs if self._pairs is not None else {k for k in self._table if k}
+        bits = max(4, (max(len(keys), 1) * 2 - 1).bit_length())
+        table = array("Q", bytes(8 * (1 << bits)))
+        mask = len(table) - 1
+        for key in keys:
+            slot = _slot(key, bits)
+            while table[slot]:
+                slot = (slot + 1) & mask
+            table[slot] = key
+        if sys.byteorder != "little":
+            table.byteswap()
+        vocab = json.dumps(self.vocabulary, separators=(",", ":")).encode()
+        # Pad the vocabulary so the table starts on an 8-byte boundary
+        vocab += b" " * (-(HEADER.size + len(vocab)) % 8)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(vocab), len(table)))
+            f.write(vocab)
+            f.write(table.tobytes())
+    
+    def __len__(self) -> int:
+        if self._pairs is not None:
+            return len(self._pairs)
+        return sum(1 for k in self._table if k)
+    
+    def close(self) -> None:
+        if self._mapped is not None:
+            self._table.release()
+            self._mapped.close()
+            self._table = None
+            self._mapped = None
+
+
+_index: Optional[InteractionIndex] = None
+
+
+def load_index() -> Optional[InteractionIndex]:
+    """Load the offline index configured by INTERACTION_INDEX_PATH, if any"""
+    global _index
+    if settings.INTERACTION_INDEX_PATH and _index is None:
+        _index = InteractionIndex.load(settings.INTERACTION_INDEX_PATH)
+        print(f"Loaded offline interaction index from {settings.INTERACTION_INDEX_PATH}")
+    return _index
+
+
+def get_index() -> Optional[InteractionIndex]:
+    return _index
+
+
+def close_index() -> None:
+    global _index
+    if _index is not None:
+        _index.close()
+        _index = None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="CareVault offline interaction index tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Build a binary index from a CSV of drug pairs")
+    build.add_argument("source", help="CSV file with drug_a,drug_b rows")
+    build.add_argument("output", help="Path of the binary index to write")
+    args = parser.parse_args(argv)
+    
+    index = InteractionIndex.from_csv(args.source)
+    index.write_binary(args.output)
+    print(f"Wrote {len(index)} pairs over {len(index.vocabulary)} drugs to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
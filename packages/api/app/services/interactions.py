@@ -0,0 +1,124 @@
+import hashlib
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from app.core import metrics
+from app.core.config import settings
+from app.services.ai_summary import basic_summary, generate_summary
+from app.services.drug_names import ingredient_names
+from app.services.interaction_index import InteractionIndex, get_index
+from app.services import rxnav
+from app.services.singleflight import SingleFlight
+
+# Identical checks that arrive while one is running share its result
+_check_flight = SingleFlight()
+metrics.register("interaction_checks", _check_flight.stats)
+
+
+def medication_list_key(medications: List[str]) -> str:
+    """Hash of the medication list exactly as given.
+    
+    Results echo the caller's own strings ("Warfarin and aspirin") and count
+    ("between the 3 medications"), so only identical lists, in the same
+    order and spelling, may share one.
+    """
+    return hashlib.sha256(json.dumps(medications).encode()).hexdigest()
+
+
+def pairs_from_lookups(medications: List[str], lookups: Dict[str, List[str]]) -> List[str]:
+    """Match each drug's RxNav interactions against the rest of the list.
+    
+    ``lookups`` is keyed by canonical name, and drugs are compared by
+    canonical name so brand names match RxNav's generic names. A
+    combination product interacts when any of its ingredients does.
+    """
+    ingredients = [ingredient_names(drug) for drug in medications]
+    # Lowercase each drug's interaction list once instead of per comparison
+    interacting = [
+        {name.lower() for key in keys for name in lookups.get(key, [])}
+        for keys in ingredients
+    ]
+    interaction_pairs = []
+    for i, drug1 in enumerate(medications):
+        for j in range(i + 1, len(medications)):
+            if any(key in interacting[i] for key in ingredients[j]):
+                interaction_pairs.append(f"{drug1} and {medications[j]}")
+    return interaction_pairs
+
+
+def pairs_from_index(index: InteractionIndex, medications: List[str]) -> List[str]:
+    """Look up every pair in the offline index by canonical ingredient name"""
+    # Flatten combination products, remembering which medication each ingredient came from
+    owners: List[int] = []
+    names: List[str] = []
+    for position, drug in enumerate(medications):
+        for name in ingredient_names(drug):
+            owners.append(position)
+            names.append(name)
+    pairs = sorted({
+        (owners[i], owners[j])
+        for i, j in index.interacting_positions(names)
+        if owners[i] != owners[j]
+    })
+    return [f"{medications[i]} and {medications[j]}" for i, j in pairs]
+
+
+def _active_index() -> Optional[InteractionIndex]:
+    """The offline index, unless it is configured as a fallback and RxNav is up"""
+    index = get_index()
+    if index is not None and settings.INTERACTION_INDEX_FALLBACK_ONLY and rxnav.is_available():
+        return None
+    return index
+
+
+async def find_interaction_pairs(medications: List[str]) -> List[str]:
+    """Detect interacting pairs, from the offline index when one is active"""
+    index = _active_index()
+    if index is not None:
+        return pairs_from_index(index, medications)
+    
+    # Resolve every drug concurrently over the shared RxNav client
+    lookups = await rxnav.fetch_all_interactions(medications)
+    return pairs_from_lookups(medications, lookups)
+
+
+async def run_interaction_check(medications: List[str]) -> Tuple[List[str], str]:
+    """Detect interacting pairs and summarize them, falling back to a basic summary"""
+    interaction_pairs = await find_interaction_pairs(medications)
+    
+    # Use OpenAI to generate a summary if API key is available
+    summary = await generate_summary(medications, interaction_pairs)
+    
+    if summary is None:
+        # Basic summary without AI
+        summary = basic_summary(medications, interaction_pairs)
+    
+    return interaction_pairs, summary
+
+
+async def check_medications(medications: List[str]) -> Tuple[List[str], str]:
+    """Run an interaction check, sharing in-flight work for an identical medication list"""
+    return await _check_flight.do(
+        medication_list_key(medications), lambda: run_interaction_check(medications)
+    )
+
+
+async def screen_batch(items: Iterable[Tuple[Any, List[str]]]) -> AsyncIterator[Dict[str, Any]]:
+    """Screen many medication lists, resolving each distinct drug only once.
+    
+    ``items`` is a sequence of ``(id, medications)``; one result dict is
+    yielded per item, in input order.
+    """
+    items = list(items)
+    index = _active_index()
+    lookups: Dict[str, List[str]] = {}
+    if index is None:
+        unique_drugs = {name for _, medications in items for name in medications}
+        # Batches may be large, so they are not held to the interactive budget
+        lookups = await rxnav.fetch_all_interactions(sorted(unique_drugs), budget=None)
+    
+    for item_id, medications in items:
+        if index is not None:
+            pairs = pairs_from_index(index, medications)
+        else:
+            pairs = pairs_from_lookups(medications, lookups)
+        yield {"id": item_id, "medications": medications, "interactions": pairs}
@@ -0,0 +1,230 @@
+"""Background interaction analysis for newly created prescriptions.
+
+``create_prescription`` stores the prescription with
+``ai_interactions = {"status": "pending"}`` and enqueues its id. Worker
+tasks started by the lifespan hook run the interaction check and store
+``{"status": "complete", "interactions": [...], "summary": ...}`` along with
+``ai_summary``. Prescriptions left pending by a restart are re-queued on
+startup.
+
+Every uvicorn worker re-queues the same pending rows, so a worker first
+claims a row with a conditional ``UPDATE`` (recording ``claimed_by`` and
+``claimed_at`` next to the pending status) and skips rows another worker
+holds. An analysis that is cancelled or raises releases its claim back to
+plain pending. A claim older than ``AI_ANALYSIS_CLAIM_TTL_SECONDS`` (left by
+a crashed process) is treated as abandoned and can be taken over, and every
+``AI_ANALYSIS_RESCAN_INTERVAL_SECONDS`` each process re-queues the pending
+rows nobody holds, so abandoned rows do not wait for the next restart.
+"""
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import or_, update
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import SessionLocal, engine
+from app.models.prescription import Prescription
+from app.services.interactions import check_medications
+
+PENDING = "pending"
+COMPLETE = "complete"
+FAILED = "failed"
+
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+_rescan_task: Optional[asyncio.Task] = None
+_worker_id = f"{socket.gethostname()}:{os.getpid()}"
+_completed = 0
+_failed = 0
+_skipped = 0
+_released = 0
+
+
+def pending_analysis() -> Dict[str, Any]:
+    return {"status": PENDING}
+
+
+def enqueue(prescription_id: int) -> None:
+    """Queue a prescription for analysis; a no-op if no workers are running"""
+    if _queue is not None:
+        _queue.put_nowait(prescription_id)
+
+
+def _claimable(now: datetime):
+    """Pending rows with no claim or an expired one"""
+    claimed_at = Prescription.ai_interactions["claimed_at"].as_string()
+    cutoff = (now - timedelta(seconds=settings.AI_ANALYSIS_CLAIM_TTL_SECONDS)).isoformat()
+    return (
+        Prescription.ai_interactions["status"].as_string() == PENDING,
+        or_(claimed_at.is_(None), claimed_at < cutoff),
+    )
+
+
+def _claim(prescription_id: int) -> bool:
+    """Take a pending prescription for this worker; False if another worker holds it"""
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        result = connection.execute(
+            update(Prescription)
+            .where(Prescription.id == prescription_id, *_claimable(now))
+            .values(ai_interactions={"status": PENDING, "claimed_by": _worker_id, "claimed_at": now.isoformat()})
+        )
+    return result.rowcount == 1
+
+
+def _release(prescription_id: int) -> None:
+    """Hand a claim held by this worker back as plain pending"""
+    with engine.begin() as connection:
+        connection.execute(
+            update(Prescription)
+            .where(
+                Prescription.id == prescription_id,
+                Prescription.ai_interactions["status"].as_string() == PENDING,
+                Prescription.ai_interactions["claimed_by"].as_string() == _worker_id,
+            )
+            .values(ai_interactions=pending_analysis())
+        )
+
+
+def _load_medication_names(prescription_id: int) -> Optional[List[str]]:
+    db = SessionLocal()
+    try:
+        prescription = db.get(Prescription, prescription_id)
+        if prescription is None:
+            return None
+        return [
+            med["name"] for med in prescription.medications or []
+            if isinstance(med, dict) and med.get("name")
+        ]
+    finally:
+        db.close()
+
+
+def _store_result(prescription_id: int, ai_interactions: Dict[str, Any], summary: Optional[str]) -> None:
+    db = SessionLocal()
+    try:
+        prescription = db.get(Prescription, prescription_id)
+        if prescription is None:
+            return
+        prescription.ai_interactions = ai_interactions
+        if summary is not None:
+            prescription.ai_summary = summary
+        db.commit()
+    finally:
+        db.close()
+
+
+def _pending_ids() -> List[int]:
+    """Pending prescriptions that no live worker holds"""
+    db = SessionLocal()
+    try:
+        rows = db.query(Prescription.id).filter(*_claimable(datetime.utcnow())).all()
+        return [row[0] for row in rows]
+    finally:
+        db.close()
+
+
+async def analyze(prescription_id: int) -> None:
+    """Run the interaction check for one prescription and store the result"""
+    global _completed, _failed, _skipped, _released
+    if not await asyncio.to_thread(_claim, prescription_id):
+        _skipped += 1
+        return
+    stored = False
+    try:
+        medications = await asyncio.to_thread(_load_medication_names, prescription_id)
+        if medications is None:
+            return
+        if len(medications) < 2:
+            pairs = []
+            summary = "At least two medications are required to check for interactions."
+        else:
+            pairs, summary = await check_medications(medications)
+        result = {"status": COMPLETE, "interactions": pairs, "summary": summary}
+        await asyncio.to_thread(_store_result, prescription_id, result, summary)
+        stored = True
+        _completed += 1
+    except Exception as e:
+        print(f"Error analyzing prescription {prescription_id}: {e}")
+        _failed += 1
+        await asyncio.to_thread(
+            _store_result, prescription_id, {"status": FAILED, "interactions": []}, None
+        )
+        stored = True
+    finally:
+        if not stored:
+            # Cancelled (shutdown) or storing the failure failed: give the row back
+            # right away instead of leaving a fresh claim that blocks every worker.
+            # Runs inline because a cancelled task cannot await another thread.
+            try:
+                _release(prescription_id)
+                _released += 1
+            except Exception as e:
+                print(f"Error releasing prescription {prescription_id}: {e}")
+
+
+async def _worker() -> None:
+    while True:
+        prescription_id = await _queue.get()
+        try:
+            await analyze(prescription_id)
+        except Exception as e:
+            # Recording the failure itself failed (e.g. a locked database); the claim was released
+            print(f"Error storing analysis failure for prescription {prescription_id}: {e}")
+        finally:
+            _queue.task_done()
+
+
+async def _requeue_pending() -> None:
+    for prescription_id in await asyncio.to_thread(_pending_ids):
+        enqueue(prescription_id)
+
+
+async def _rescan_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.AI_ANALYSIS_RESCAN_INTERVAL_SECONDS)
+        try:
+            await _requeue_pending()
+        except Exception as e:
+            print(f"Error re-scanning pending prescriptions: {e}")
+
+
+async def start_workers() -> None:
+    """Start the analysis workers and re-queue analyses interrupted by a restart"""
+    global _queue, _rescan_task
+    if _queue is not None:
+        return
+    _queue = asyncio.Queue()
+    for _ in range(settings.AI_ANALYSIS_WORKERS):
+        _workers.append(asyncio.create_task(_worker()))
+    await _requeue_pending()
+    if settings.AI_ANALYSIS_RESCAN_INTERVAL_SECONDS > 0:
+        _rescan_task = asyncio.create_task(_rescan_periodically())
+
+
+async def stop_workers() -> None:
+    """Cancel the workers; unfinished analyses are released and resume on startup"""
+    global _queue, _rescan_task
+    tasks = _workers + ([_rescan_task] if _rescan_task is not None else [])
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _workers.clear()
+    _rescan_task = None
+    _queue = None
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "queued": _queue.qsize() if _queue is not None else 0,
+        "workers": len(_workers),
+        "completed": _completed,
+        "failed": _failed,
+        "skipped": _skipped,
+        "released": _released,
+    }
+
+
+metrics.register("prescription_analysis", stats)
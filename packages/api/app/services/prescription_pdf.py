@@ -0,0 +1,264 @@
+"""PDF rendering for finalized prescriptions.
+
+Finalizing a prescription clears ``pdf_url`` and enqueues its id. Worker
+tasks started by the lifespan hook render the PDF in a process pool, so
+reportlab never runs on the event loop. The bytes are stored in a
+content-addressed artifact directory (``<PDF_ARTIFACT_DIR>/ab/abcd....pdf``)
+and ``pdf_url`` is set to an immutable URL naming the digest. Finalized
+prescriptions still without a PDF after a restart are re-queued on startup.
+"""
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+from reportlab.graphics import renderPDF
+from reportlab.graphics.barcode.qr import QrCodeWidget
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from sqlalchemy import select
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.appointment import Appointment
+from app.models.prescription import Prescription, PrescriptionStatus
+from app.models.share_token import ShareToken
+from app.services import qr
+
+_pool: Optional[ProcessPoolExecutor] = None
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+_rendered = 0
+_reused = 0
+_failed = 0
+
+
+def artifact_path(digest: str) -> str:
+    return os.path.join(settings.PDF_ARTIFACT_DIR, digest[:2], f"{digest}.pdf")
+
+
+def artifact_url(prescription_id: int, digest: str) -> str:
+    return f"/api/prescriptions/{prescription_id}/pdf/{digest}.pdf"
+
+
+def digest_from_url(pdf_url: Optional[str]) -> Optional[str]:
+    """Digest named by a stored pdf_url, or None when no PDF has been rendered"""
+    if not pdf_url or not pdf_url.endswith(".pdf"):
+        return None
+    return pdf_url.rsplit("/", 1)[-1][:-len(".pdf")]
+
+
+def store_artifact(pdf: bytes) -> str:
+    """Write ``pdf`` under its SHA-256 digest (once) and return the digest"""
+    digest = hashlib.sha256(pdf).hexdigest()
+    path = artifact_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A private temp file per call: concurrent stores of one digest must not share it
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+            f.write(pdf)
+        os.replace(f.name, path)
+    return digest
+
+
+def render_pdf(document: Dict[str, Any]) -> bytes:
+    """Render one prescription document; runs in a worker process"""
+    buffer = io.BytesIO()
+    # invariant=1 drops timestamps and random ids, so equal input gives equal bytes
+    pdf = canvas.Canvas(buffer, pagesize=letter, invariant=1)
+    pdf.setTitle(f"Prescription #{document['id']}")
+    width, height = letter
+    
+    pdf.setFont("Helvetica-Bold", 18)
+    pdf.drawString(inch, height - inch, "CareVault Prescription")
+    pdf.setFont("Helvetica", 10)
+    y = height - 1.4 * inch
+    for label, value in (
+        ("Prescription", f"#{document['id']}"),
+        ("Patient", f"{document['patient_name']} <{document['patient_email']}>"),
+        ("Prescriber", document["doctor_name"]),
+        ("License", document.get("license_number") or "-"),
+        ("Issued", document["created_at"]),
+        ("Finalized", document.get("finalized_at") or "-"),
+    ):
+        pdf.drawString(inch, y, f"{label}: {value}")
+        y -= 0.22 * inch
+    
+    y -= 0.2 * inch
+    pdf.setFont("Helvetica-Bold", 12)
+    pdf.drawString(inch, y, "Medications")
+    pdf.setFont("Helvetica", 10)
+    y -= 0.3 * inch
+    for med in document["medications"]:
+        pdf.drawString(1.2 * inch, y, f"- {med.get('name', '')}  {med.get('dosage', '')}  {med.get('frequency', '')}")
+        y -= 0.22 * inch
+        if y < 2.5 * inch:
+            pdf.showPage()
+            pdf.setFont("Helvetica", 10)
+            y = height - inch
+    
+    if document.get("interactions"):
+        y -= 0.2 * inch
+        pdf.setFont("Helvetica-Bold", 12)
+        pdf.drawString(inch, y, "Interaction warnings")
+        pdf.setFont("Helvetica", 10)
+        y -= 0.3 * inch
+        for interaction in document["interactions"]:
+            pdf.drawString(1.2 * inch, y, f"- {interaction}")
+            y -= 0.22 * inch
+    
+    if document.get("share_url"):
+        widget = QrCodeWidget(document["share_url"])
+        x0, y0, x1, y1 = widget.getBounds()
+        size = 1.5 * inch
+        drawing = Drawing(size, size, transform=[size / (x1 - x0), 0, 0, size / (y1 - y0), 0, 0])
+        drawing.add(widget)
+        renderPDF.draw(drawing, pdf, width - inch - size, inch)
+        pdf.drawString(inch, inch + 0.1 * inch, "Scan to verify this prescription")
+    
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def load_document(prescription_id: int) -> Optional[Dict[str, Any]]:
+    """Plain, picklable data the renderer needs for one prescription"""
+    db = SessionLocal()
+    try:
+        prescription = db.get(Prescription, prescription_id)
+        if prescription is None:
+            return None
+        appointment: Appointment = prescription.appointment
+        token = db.execute(select(ShareToken.token).where(
+            ShareToken.prescription_id == prescription_id,
+            ShareToken.is_active == True
+        )).scalars().first()
+        ai_interactions = prescription.ai_interactions or {}
+        return {
+            "id": prescription.id,
+            "patient_name": appointment.patient.full_name,
+            "patient_email": appointment.patient.email,
+            "doctor_name": appointment.doctor.full_name,
+            "license_number": appointment.doctor.license_number,
+            "medications": [med for med in prescription.medications or [] if isinstance(med, dict)],
+            "interactions": ai_interactions.get("interactions", []),
+            "created_at": prescription.created_at.strftime("%Y-%m-%d") if prescription.created_at else "-",
+            "finalized_at": prescription.finalized_at.strftime("%Y-%m-%d %H:%M") if prescription.finalized_at else None,
+            "share_url": qr.share_url(token) if token else None,
+        }
+    finally:
+        db.close()
+
+
+def _store_url(prescription_id: int, pdf_url: str) -> None:
+    db = SessionLocal()
+    try:
+        prescription = db.get(Prescription, prescription_id)
+        if prescription is not None:
+            prescription.pdf_url = pdf_url
+            db.commit()
+    finally:
+        db.close()
+
+
+def _pending_ids() -> List[int]:
+    db = SessionLocal()
+    try:
+        rows = db.query(Prescription.id).filter(
+            Prescription.status == PrescriptionStatus.FINALIZED,
+            Prescription.pdf_url.is_(None),
+        ).all()
+        return [row[0] for row in rows]
+    finally:
+        db.close()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.PDF_RENDER_PROCESSES)
+    return _pool
+
+
+async def render_bytes(document: Dict[str, Any]) -> bytes:
+    """Render in the process pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), render_pdf, document)
+
+
+async def ensure_pdf(prescription_id: int) -> Optional[str]:
+    """Render a prescription, store the artifact if it is new and point pdf_url at it"""
+    global _rendered, _reused
+    document = await asyncio.to_thread(load_document, prescription_id)
+    if document is None:
+        return None
+    pdf = await render_bytes(document)
+    digest = hashlib.sha256(pdf).hexdigest()
+    if os.path.exists(artifact_path(digest)):
+        _reused += 1
+    else:
+        await asyncio.to_thread(store_artifact, pdf)
+        _rendered += 1
+    await asyncio.to_thread(_store_url, prescription_id, artifact_url(prescription_id, digest))
+    return digest
+
+
+def enqueue(prescription_id: int) -> None:
+    """Queue a finalized prescription for rendering; a no-op if no workers are running"""
+    if _queue is not None:
+        _queue.put_nowait(prescription_id)
+
+
+async def _worker() -> None:
+    global _failed
+    while True:
+        prescription_id = await _queue.get()
+        try:
+            await ensure_pdf(prescription_id)
+        except Exception as e:
+            print(f"Error rendering PDF for prescription {prescription_id}: {e}")
+            _failed += 1
+        finally:
+            _queue.task_done()
+
+
+async def start_workers() -> None:
+    """Start the render workers and re-queue finalized prescriptions without a PDF"""
+    global _queue
+    if _queue is not None:
+        return
+    _queue = asyncio.Queue()
+    for _ in range(settings.PDF_RENDER_PROCESSES):
+        _workers.append(asyncio.create_task(_worker()))
+    for prescription_id in await asyncio.to_thread(_pending_ids):
+        enqueue(prescription_id)
+
+
+async def stop_workers() -> None:
+    """Cancel the workers and shut the process pool down; pending renders resume on startup"""
+    global _queue, _pool
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "queued": _queue.qsize() if _queue is not None else 0,
+        "workers": len(_workers),
+        "rendered": _rendered,
+        "reused": _reused,
+        "failed": _failed,
+    }
+
+
+metrics.register("prescription_pdf", stats)
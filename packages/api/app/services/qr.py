@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import io
+import math
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import qrcode
+from app.core import metrics
+from app.core.config import settings
+from app.services.cache import MISSING, TTLCache
+
+# Bump whenever the rendering parameters change so cached images are re-rendered
+RENDER_VERSION = "1"
+
+
+@dataclass(frozen=True)
+class QRImage:
+    png: bytes
+    etag: str
+
+
+# The image for a share URL never changes, so entries only leave by LRU eviction
+_memory = TTLCache(settings.QR_CACHE_MAX_ENTRIES, ttl=math.inf)
+_renders = 0
+_disk_hits = 0
+
+
+def share_url(token: str) -> str:
+    return f"{settings.SHARE_BASE_URL.rstrip('/')}/{token}"
+
+
+def _cache_key(url: str) -> str:
+    return hashlib.sha256(f"{RENDER_VERSION}:{url}".encode()).hexdigest()
+
+
+def _image(png: bytes) -> QRImage:
+    # Strong validator: identical bytes always get the same tag
+    return QRImage(png=png, etag=hashlib.sha256(png).hexdigest()[:32])
+
+
+def render_png(url: str) -> bytes:
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(url)
+    qr.make(fit=True)
+    
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _disk_path(key: str) -> Optional[str]:
+    if not settings.QR_CACHE_DIR:
+        return None
+    return os.path.join(settings.QR_CACHE_DIR, key[:2], f"{key}.png")
+
+
+def _read_disk(key: str) -> Optional[bytes]:
+    path = _disk_path(key)
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_disk(key: str, png: bytes) -> None:
+    path = _disk_path(key)
+    if path is None:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write a private temp file then rename, so readers and concurrent writers never see a partial file
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+        f.write(png)
+    os.replace(f.name, path)
+
+
+def _load(key: str, url: str) -> QRImage:
+    global _renders, _disk_hits
+    png = _read_disk(key)
+    if png is not None:
+        _disk_hits += 1
+    else:
+        png = render_png(url)
+        _renders += 1
+        _write_disk(key, png)
+    image = _image(png)
+    _memory.set(key, image)
+    return image
+
+
+def get_qr(url: str) -> QRImage:
+    """Return the QR image for ``url`` from memory, disk or a fresh render"""
+    key = _cache_key(url)
+    image = _memory.get(key)
+    if image is not MISSING:
+        return image
+    return _load(key, url)
+
+
+async def get_qr_async(url: str) -> QRImage:
+    """get_qr for request handlers; misses render off the event loop"""
+    key = _cache_key(url)
+    image = _memory.get(key)
+    if image is not MISSING:
+        return image
+    return await asyncio.to_thread(_load, key, url)
+
+
+def stats() -> Dict[str, Any]:
+    return {**_memory.stats(), "renders": _renders, "disk_hits": _disk_hits}
+
+
+metrics.register("qr_cache", stats)
@@ -0,0 +1,50 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets: ``rate`` requests per second with bursts up to ``burst``.
+    
+    Buckets live in an LRU bounded by ``max_clients``; an evicted client
+    simply starts again with a full bucket.
+    """
+    
+    def __init__(self, rate: float, burst: int, max_clients: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+    
+    def acquire(self, client: str) -> float:
+        """Take a token for ``client``; returns 0 when allowed, else seconds until one is available"""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(client, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+            self.allowed += 1
+        else:
+            retry_after = (1 - tokens) / self.rate
+            self.limited += 1
+        self._buckets[client] = (tokens, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return retry_after
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._buckets),
+            "rate": self.rate,
+            "burst": self.burst,
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
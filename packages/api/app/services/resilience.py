@@ -0,0 +1,137 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Fail fast after repeated upstream failures.
+    
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    ``allow`` returns False for ``reset_timeout`` seconds. It then lets a
+    single trial call through (half-open); success closes it again and
+    failure re-opens it.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+    
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being rejected without a trial"""
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+    
+    def allow(self) -> bool:
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+    
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+    
+    def record_abandoned(self) -> None:
+        """A call ended without an upstream verdict (e.g. cancelled); free the trial slot"""
+        self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class LatencyTracker:
+    """Call counts and latency percentiles over a sliding window of samples"""
+    
+    def __init__(self, window: int = 1000):
+        self._samples: deque = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+    
+    def record(self, seconds: float, ok: bool = True) -> None:
+        self.calls += 1
+        if not ok:
+            self.failures += 1
+        self._samples.append(seconds)
+    
+    def _percentile(self, ordered: list, fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+    
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self._samples)
+        latency = {}
+        if ordered:
+            latency = {
+                "p50_ms": round(self._percentile(ordered, 0.50) * 1000, 1),
+                "p95_ms": round(self._percentile(ordered, 0.95) * 1000, 1),
+                "p99_ms": round(self._percentile(ordered, 0.99) * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return {"calls": self.calls, "failures": self.failures, **latency}
+
+
+async def hedged(fn: Callable[[], Awaitable[T]], delay: float, max_attempts: int = 2) -> T:
+    """Run ``fn``, starting a duplicate attempt if it has not finished after ``delay``.
+    
+    The first successful attempt wins and the rest are cancelled. Only use
+    this for idempotent calls. ``delay <= 0`` disables hedging.
+    """
+    if delay <= 0 or max_attempts < 2:
+        return await fn()
+    
+    attempts = 1
+    pending = {asyncio.ensure_future(fn())}
+    last_error: BaseException = None
+    try:
+        while pending:
+            timeout = delay if attempts < max_attempts else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+            # Hedge on slowness, or replace an attempt that failed outright
+            if attempts < max_attempts and (not done or not pending):
+                attempts += 1
+                pending.add(asyncio.ensure_future(fn()))
+        raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
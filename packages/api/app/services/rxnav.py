@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from app.core import metrics
+from app.core.config import settings
+from app.services.cache import MISSING, SQLiteStore, TieredCache
+from app.services import drug_names
+from app.services.interaction_index import normalize_drug_name
+from app.services.resilience import CircuitBreaker, LatencyTracker, UpstreamUnavailable, hedged
+
+logger = logging.getLogger(__name__)
+
+# Shared connection pool, opened and closed by the app lifespan hook
+_client: Optional[httpx.AsyncClient] = None
+
+# Two-tier caches for name -> RxCUI and RxCUI -> interacting drug names
+_store = (
+    SQLiteStore(settings.RXNAV_CACHE_PATH, settings.RXNAV_CACHE_DISK_MAX_ENTRIES)
+    if settings.RXNAV_CACHE_PATH
+    else None
+)
+_rxcui_cache = TieredCache(
+    "rxcui",
+    maxsize=settings.RXNAV_CACHE_MAX_ENTRIES,
+    ttl=settings.RXNAV_CACHE_TTL_SECONDS,
+    negative_ttl=settings.RXNAV_NEGATIVE_CACHE_TTL_SECONDS,
+    store=_store,
+)
+_interaction_cache = TieredCache(
+    "interactions",
+    maxsize=settings.RXNAV_CACHE_MAX_ENTRIES,
+    ttl=settings.RXNAV_CACHE_TTL_SECONDS,
+    negative_ttl=settings.RXNAV_NEGATIVE_CACHE_TTL_SECONDS,
+    store=_store,
+)
+
+_breaker = CircuitBreaker(
+    failure_threshold=settings.RXNAV_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.RXNAV_BREAKER_RESET_SECONDS,
+)
+_latency = LatencyTracker()
+
+
+async def open_client() -> httpx.AsyncClient:
+    """Open the process-wide pooled RxNav client"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=settings.RXNAV_BASE_URL,
+            timeout=httpx.Timeout(settings.RXNAV_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=settings.RXNAV_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.RXNAV_MAX_CONCURRENCY,
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the pooled RxNav client on shutdown"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_client() -> httpx.AsyncClient:
+    # Fall back to lazy creation when running outside the lifespan hook
+    if _client is None:
+        return await open_client()
+    return _client
+
+
+def prune_cache() -> None:
+    """Drop expired and excess rows from the on-disk RxNav cache"""
+    if _store is not None:
+        removed = _store.prune()
+        print(f"Pruned {removed} RxNav cache entries")
+
+
+def close_cache() -> None:
+    if _store is not None:
+        _store.close()
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {"rxcui": _rxcui_cache.stats(), "interactions": _interaction_cache.stats()}
+
+
+metrics.register("rxnav_cache", cache_stats)
+metrics.register("rxnav_upstream", lambda: {"breaker": _breaker.stats(), "latency": _latency.stats()})
+
+
+def is_available() -> bool:
+    """False while the circuit breaker is failing RxNav calls fast"""
+    return not _breaker.is_open
+
+
+async def _get_json(path: str, params: Dict[str, str]) -> Dict[str, Any]:
+    """GET an RxNav resource through the circuit breaker, hedged if configured"""
+    if not _breaker.allow():
+        raise UpstreamUnavailable("RxNav circuit breaker is open")
+    client = await get_client()
+    
+    async def attempt() -> Dict[str, Any]:
+        response = await client.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+    
+    started = time.monotonic()
+    # True/False once RxNav has answered or failed; None when the call never got a verdict
+    ok: Optional[bool] = None
+    try:
+        data = await hedged(attempt, settings.RXNAV_HEDGE_DELAY_SECONDS)
+        ok = True
+        return data
+    except httpx.HTTPStatusError as e:
+        # A 4xx means RxNav is up and answering; only 5xx counts against it
+        ok = e.response.status_code < 500
+        raise
+    except httpx.TransportError:
+        ok = False
+        raise
+    finally:
+        if ok is None:
+            # Cancelled (a check that ran past its budget) or a bad payload: not RxNav's fault
+            _breaker.record_abandoned()
+        else:
+            _latency.record(time.monotonic() - started, ok)
+            if ok:
+                _breaker.record_success()
+            else:
+                _breaker.record_failure()
+
+
+def _lookup_name(drug_name: str) -> Tuple[Optional[str], str]:
+    """Return a locally known RxCUI (if any) and the name to query RxNav with"""
+    match = drug_names.resolve(drug_name)
+    if match is None:
+        return None, drug_name
+    return match.rxcui, match.canonical
+
+
+async def resolve_rxcui(drug_name: str) -> Optional[str]:
+    """Resolve a drug name to its RxCUI, caching unknown names as None.
+    
+    Names in the local drug name list resolve in-process; only names it
+    lacks an RxCUI for are sent to RxNav, using the canonical generic name.
+    """
+    known_rxcui, drug_name = _lookup_name(drug_name)
+    if known_rxcui:
+        return known_rxcui
+    key = normalize_drug_name(drug_name)
+    cached = await _rxcui_cache.get(key)
+    if cached is not MISSING:
+        return cached
+    
+    data = await _get_json("/rxcui.json", {"name": drug_name})
+    rxnorm_ids = data.get("idGroup", {}).get("rxnormId")
+    rxcui = rxnorm_ids[0] if rxnorm_ids else None
+    
+    await _rxcui_cache.set(key, rxcui)
+    return rxcui
+
+
+async def fetch_interacting_drugs(rxcui: str) -> List[str]:
+    """Fetch the names of drugs that interact with an RxCUI"""
+    cached = await _interaction_cache.get(rxcui)
+    if cached is not MISSING:
+        return cached
+    
+    interactions_data = await _get_json("/interaction/interaction.json", {"rxcui": rxcui})
+    
+    interactions = []
+    interaction_groups = interactions_data.get("interactionTypeGroup", [])
+    for group in interaction_groups:
+        for interaction_type in group.get("interactionType", []):
+            for pair in interaction_type.get("interactionPair", []):
+                concepts = pair.get("interactionConcept", [])
+                if len(concepts) < 2:
+                    continue
+                interacting_drug = concepts[1].get("minConceptItem", {}).get("name", "")
+                if interacting_drug:
+                    interactions.append(interacting_drug)
+    
+    await _interaction_cache.set(rxcui, interactions)
+    return interactions
+
+
+async def cached_interactions(drug_name: str) -> List[str]:
+    """Best-effort answer from cached data only, accepting expired entries"""
+    rxcui, drug_name = _lookup_name(drug_name)
+    if not rxcui:
+        rxcui = await _rxcui_cache.get(normalize_drug_name(drug_name), allow_stale=True)
+        if not rxcui or rxcui is MISSING:
+            return []
+    interactions = await _interaction_cache.get(rxcui, allow_stale=True)
+    return [] if interactions is MISSING else interactions
+
+
+async def fetch_rxnav_interactions(drug_name: str) -> List[str]:
+    """Fetch drug interactions from RxNav API, falling back to stale cache"""
+    try:
+        rxcui = await resolve_rxcui(drug_name)
+        if rxcui is None:
+            return []
+        return await fetch_interacting_drugs(rxcui)
+    except UpstreamUnavailable:
+        return await cached_interactions(drug_name)
+    except (httpx.HTTPError, ValueError) as e:
+        # Transport failures, error statuses and malformed JSON; anything else is a bug
+        logger.warning("RxNav lookup for %s failed: %r", drug_name, e)
+        return await cached_interactions(drug_name)
+
+
+async def fetch_all_interactions(
+    names: List[str], budget: Optional[float] = settings.RXNAV_CHECK_BUDGET_SECONDS
+) -> Dict[str, List[str]]:
+    """Look up interactions for every drug concurrently.
+    
+    Lookups share one pooled client and are capped at RXNAV_MAX_CONCURRENCY
+    in flight. The whole fan-out is bounded by ``budget`` seconds, so
+    latency follows the slowest single drug rather than the sum and never
+    exceeds the budget; drugs still pending at the deadline are answered
+    from cache. Pass ``budget=None`` for offline jobs. Combination products
+    are looked up per ingredient. Results are keyed by canonical ingredient
+    name, so brand and generic names share one lookup.
+    """
+    semaphore = asyncio.Semaphore(settings.RXNAV_MAX_CONCURRENCY)
+    
+    async def lookup(drug_name: str) -> List[str]:
+        async with semaphore:
+            return await fetch_rxnav_interactions(drug_name)
+    
+    # Canonical name -> the name to query with; names not in the local list go out as typed
+    queries: Dict[str, str] = {}
+    for name in names:
+        for ingredient in drug_names.split_ingredients(name):
+            queries.setdefault(drug_names.canonical_name(ingredient), ingredient)
+    if not queries:
+        return {}
+    tasks = {key: asyncio.ensure_future(lookup(query)) for key, query in queries.items()}
+    done, pending = await asyncio.wait(tasks.values(), timeout=budget)
+    for task in pending:
+        task.cancel()
+    
+    results = {}
+    for name, task in tasks.items():
+        if task in done:
+            results[name] = task.result()
+        else:
+            print(f"RxNav lookup for {queries[name]} exceeded the check budget")
+            results[name] = await cached_interactions(queries[name])
+    return results
@@ -0,0 +1,88 @@
+"""Re-screen stored prescriptions for drug interactions.
+
+Run against every prescription in the database with:
+
+    python -m app.services.screening [--update] > results.ndjson
+
+``--update`` also writes the detected pairs back to
+``Prescription.ai_interactions``.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import List, Optional, Tuple
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.models.appointment import Appointment
+from app.models.prescription import Prescription, PrescriptionStatus
+from app.services.interactions import screen_batch
+
+
+def _medications_query(doctor_id: Optional[int]) -> Select:
+    query = select(Prescription.id, Prescription.medications).where(
+        Prescription.status != PrescriptionStatus.CANCELLED
+    )
+    if doctor_id is not None:
+        query = query.join(Appointment).where(Appointment.doctor_id == doctor_id)
+    return query.order_by(Prescription.id)
+
+
+def _drug_names(medications) -> List[str]:
+    names = [med.get("name", "") for med in medications or [] if isinstance(med, dict)]
+    return [name for name in names if name]
+
+
+def load_prescription_medications(db: Session, doctor_id: Optional[int] = None) -> List[Tuple[int, List[str]]]:
+    """Return ``(prescription_id, drug names)`` for every non-cancelled prescription"""
+    rows = db.execute(_medications_query(doctor_id).execution_options(yield_per=1000))
+    return [(prescription_id, _drug_names(medications)) for prescription_id, medications in rows]
+
+
+async def load_prescription_medications_async(
+    db: AsyncSession, doctor_id: Optional[int] = None
+) -> List[Tuple[int, List[str]]]:
+    """Async variant of load_prescription_medications for request handlers"""
+    rows = await db.stream(_medications_query(doctor_id).execution_options(yield_per=1000))
+    return [(prescription_id, _drug_names(medications)) async for prescription_id, medications in rows]
+
+
+async def run(update: bool) -> None:
+    db = SessionLocal()
+    try:
+        items = load_prescription_medications(db)
+        async for result in screen_batch(items):
+            sys.stdout.write(json.dumps(result) + "\n")
+            if update:
+                prescription = db.get(Prescription, result["id"])
+                ai_interactions = dict(prescription.ai_interactions or {})
+                ai_interactions["interactions"] = result["interactions"]
+                prescription.ai_interactions = ai_interactions
+        if update:
+            db.commit()
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Re-screen all prescriptions for interactions")
+    parser.add_argument("--update", action="store_true", help="Store detected pairs on each prescription")
+    args = parser.parse_args(argv)
+    
+    from app.services import interaction_index, rxnav
+    interaction_index.load_index()
+    
+    async def screen():
+        try:
+            await run(args.update)
+        finally:
+            await rxnav.close_client()
+            rxnav.close_cache()
+    
+    asyncio.run(screen())
+
+
+if __name__ == "__main__":
+    main()
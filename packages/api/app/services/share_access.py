@@ -0,0 +1,112 @@
+"""Write-behind access analytics for share links.
+
+``record`` counts a share-link hit in memory. A background task started by
+the lifespan hook flushes the counts every ``SHARE_ACCESS_FLUSH_SECONDS`` as
+one batched ``UPDATE`` (``access_count += n``, ``last_accessed_at``), and
+the shutdown hook flushes whatever is left. A failed flush puts its counts
+back so they go out with the next one.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, func, update
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import engine
+from app.models.share_token import ShareToken
+
+# token -> (hits since last flush, latest hit)
+_pending: Dict[str, Tuple[int, datetime]] = {}
+_task: Optional[asyncio.Task] = None
+_flushed_hits = 0
+_flushes = 0
+_failures = 0
+_last_flush_ms = 0.0
+
+_increment = (
+    update(ShareToken.__table__)
+    .where(ShareToken.__table__.c.token == bindparam("b_token"))
+    .values(
+        access_count=func.coalesce(ShareToken.__table__.c.access_count, 0) + bindparam("b_hits"),
+        last_accessed_at=bindparam("b_last"),
+    )
+)
+
+
+def record(token: str) -> None:
+    hits, _ = _pending.get(token, (0, None))
+    _pending[token] = (hits + 1, datetime.utcnow())
+
+
+def _merge_back(batch: Dict[str, Tuple[int, datetime]]) -> None:
+    for token, (hits, last) in batch.items():
+        pending_hits, pending_last = _pending.get(token, (0, last))
+        _pending[token] = (pending_hits + hits, max(last, pending_last))
+
+
+def _write(batch: Dict[str, Tuple[int, datetime]]) -> None:
+    params: List[Dict[str, Any]] = [
+        {"b_token": token, "b_hits": hits, "b_last": last}
+        for token, (hits, last) in batch.items()
+    ]
+    with engine.begin() as connection:
+        connection.execute(_increment, params)
+
+
+async def flush() -> int:
+    """Write pending counts in one batch; returns the number of hits written"""
+    global _pending, _flushed_hits, _flushes, _failures, _last_flush_ms
+    if not _pending:
+        return 0
+    # Swap on the event loop so hits recorded during the write land in the next batch
+    batch, _pending = _pending, {}
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(_write, batch)
+    except Exception as e:
+        print(f"Error flushing share access counts: {e}")
+        _failures += 1
+        _merge_back(batch)
+        return 0
+    hits = sum(hits for hits, _ in batch.values())
+    _flushed_hits += hits
+    _flushes += 1
+    _last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+    return hits
+
+
+async def _flush_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.SHARE_ACCESS_FLUSH_SECONDS)
+        await flush()
+
+
+def start_flusher() -> None:
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_flush_periodically())
+
+
+async def stop_flusher() -> None:
+    """Stop the periodic task and write the remaining counts"""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
+    await flush()
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "pending_tokens": len(_pending),
+        "pending_hits": sum(hits for hits, _ in _pending.values()),
+        "flushed_hits": _flushed_hits,
+        "flushes": _flushes,
+        "failures": _failures,
+        "last_flush_ms": _last_flush_ms,
+    }
+
+
+metrics.register("share_access", stats)
@@ -0,0 +1,44 @@
+"""In-process cache of rendered share payloads for ``GET /api/share/{token}``.
+
+Entries are the encoded JSON response bodies, keyed by token. Revocation
+evicts the affected tokens locally and bumps a shared epoch file so every
+other worker on the host drops its entries on its next lookup.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+from app.core import metrics
+from app.core.config import settings
+from app.services.cache import FileEpoch, TTLCache
+
+_payloads = TTLCache(settings.SHARE_CACHE_MAX_ENTRIES, settings.SHARE_CACHE_TTL_SECONDS)
+_epoch = FileEpoch(settings.SHARE_CACHE_EPOCH_PATH)
+
+
+def get(token: str) -> Any:
+    """Cached body for ``token``, or MISSING"""
+    if _epoch.changed():
+        _payloads.clear()
+    return _payloads.get(token)
+
+
+def put(token: str, body: bytes, expires_at: Optional[datetime] = None) -> None:
+    ttl = settings.SHARE_CACHE_TTL_SECONDS
+    if expires_at is not None:
+        # Never serve a cached payload past the link's own expiry
+        ttl = min(ttl, (expires_at - datetime.utcnow()).total_seconds())
+    if ttl > 0:
+        _payloads.set(token, body, ttl)
+
+
+def evict(tokens: Iterable[str]) -> None:
+    """Drop ``tokens`` here and signal other workers to drop their entries"""
+    for token in tokens:
+        _payloads.delete(token)
+    _epoch.bump()
+
+
+def stats() -> Dict[str, Any]:
+    return {**_payloads.stats(), "epoch": _epoch.stats()}
+
+
+metrics.register("share_cache", stats)
@@ -0,0 +1,160 @@
+"""Background expiry sweeper for share tokens.
+
+Every ``SHARE_SWEEP_INTERVAL_SECONDS`` a task started by the lifespan hook
+deactivates active tokens whose ``expires_at`` has passed, walking the
+``(is_active, expires_at)`` index in batches of ``SHARE_SWEEP_BATCH_SIZE``.
+Inactive tokens (expired or revoked) older than ``SHARE_TOKEN_RETENTION_DAYS``
+are then moved to ``share_tokens_archive``, again in batches, so the live
+table only holds tokens that can still be served or were recently retired.
+
+Share lookups already refuse expired tokens in their own query, so the
+sweeper only keeps the table small; running late never serves an expired
+link. Each batch is its own transaction, and a failed sweep is retried on
+the next interval.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, func, insert, literal, select, update
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import engine
+from app.models.share_token import ShareToken, ShareTokenArchive
+
+_tokens = ShareToken.__table__
+_archive = ShareTokenArchive.__table__
+ARCHIVE_COLUMNS = [column.name for column in _archive.columns if column.name != "archived_at"]
+
+_task: Optional[asyncio.Task] = None
+_sweeps = 0
+_failures = 0
+_deactivated = 0
+_archived = 0
+_last_sweep_at: Optional[datetime] = None
+_last_sweep_ms = 0.0
+_last_rows_per_second = 0.0
+_lag_seconds = 0.0
+
+
+def _deactivate_batch(now: datetime) -> List[datetime]:
+    """Deactivate up to one batch of expired tokens; returns their expiry times"""
+    with engine.begin() as connection:
+        rows = connection.execute(
+            select(_tokens.c.id, _tokens.c.expires_at)
+            .where(_tokens.c.is_active == True, _tokens.c.expires_at <= now)
+            .order_by(_tokens.c.expires_at)
+            .limit(settings.SHARE_SWEEP_BATCH_SIZE)
+        ).all()
+        if rows:
+            connection.execute(
+                update(_tokens)
+                .where(_tokens.c.id.in_([row.id for row in rows]))
+                .values(is_active=False)
+            )
+    return [row.expires_at for row in rows]
+
+
+def _archive_batch(cutoff: datetime, now: datetime) -> int:
+    """Move up to one batch of long-inactive tokens to the archive table"""
+    retired_at = func.coalesce(_tokens.c.revoked_at, _tokens.c.expires_at, _tokens.c.created_at)
+    with engine.begin() as connection:
+        ids = connection.execute(
+            select(_tokens.c.id)
+            .where(_tokens.c.is_active == False, retired_at < cutoff)
+            .limit(settings.SHARE_SWEEP_BATCH_SIZE)
+        ).scalars().all()
+        if ids:
+            connection.execute(
+                insert(_archive).from_select(
+                    ARCHIVE_COLUMNS + ["archived_at"],
+                    select(*[_tokens.c[name] for name in ARCHIVE_COLUMNS], literal(now))
+                    .where(_tokens.c.id.in_(ids)),
+                )
+            )
+            connection.execute(delete(_tokens).where(_tokens.c.id.in_(ids)))
+    return len(ids)
+
+
+def sweep_once() -> Dict[str, Any]:
+    """Deactivate every expired token and archive the retired ones, batch by batch"""
+    global _sweeps, _deactivated, _archived, _last_sweep_at, _last_sweep_ms, _last_rows_per_second, _lag_seconds
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    deactivated = 0
+    archived = 0
+    lag = 0.0
+    
+    while True:
+        expired = _deactivate_batch(now)
+        if expired and not deactivated:
+            # Batches come in expiry order, so the first row is the most overdue
+            lag = (now - expired[0]).total_seconds()
+        deactivated += len(expired)
+        if len(expired) < settings.SHARE_SWEEP_BATCH_SIZE:
+            break
+    
+    if settings.SHARE_TOKEN_RETENTION_DAYS > 0:
+        cutoff = now - timedelta(days=settings.SHARE_TOKEN_RETENTION_DAYS)
+        while True:
+            moved = _archive_batch(cutoff, now)
+            archived += moved
+            if moved < settings.SHARE_SWEEP_BATCH_SIZE:
+                break
+    
+    elapsed = time.perf_counter() - started
+    _sweeps += 1
+    _deactivated += deactivated
+    _archived += archived
+    _last_sweep_at = now
+    _last_sweep_ms = round(elapsed * 1000, 1)
+    _last_rows_per_second = round((deactivated + archived) / elapsed, 1) if elapsed else 0.0
+    _lag_seconds = round(lag, 1)
+    return {"deactivated": deactivated, "archived": archived}
+
+
+async def _sweep_periodically() -> None:
+    global _failures
+    while True:
+        try:
+            result = await asyncio.to_thread(sweep_once)
+            if result["deactivated"] or result["archived"]:
+                print(f"Share token sweep: {result['deactivated']} expired, {result['archived']} archived")
+        except Exception as e:
+            print(f"Error sweeping share tokens: {e}")
+            _failures += 1
+        await asyncio.sleep(settings.SHARE_SWEEP_INTERVAL_SECONDS)
+
+
+def start_sweeper() -> None:
+    global _task
+    if _task is None and settings.SHARE_SWEEP_INTERVAL_SECONDS > 0:
+        _task = asyncio.create_task(_sweep_periodically())
+
+
+async def stop_sweeper() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "sweeps": _sweeps,
+        "failures": _failures,
+        "deactivated": _deactivated,
+        "archived": _archived,
+        "last_sweep_at": _last_sweep_at.isoformat() if _last_sweep_at else None,
+        "seconds_since_last_sweep": (
+            round((datetime.utcnow() - _last_sweep_at).total_seconds(), 1) if _last_sweep_at else None
+        ),
+        "last_sweep_ms": _last_sweep_ms,
+        "last_rows_per_second": _last_rows_per_second,
+        # How long the most overdue token had been expired when the last sweep reached it
+        "lag_seconds": _lag_seconds,
+    }
+
+
+metrics.register("share_sweeper", stats)
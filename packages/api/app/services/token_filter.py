@@ -0,0 +1,185 @@
+"""Membership filter of active share tokens.
+
+``GET /api/share/{token}`` consults the filter before touching the
+database, so guessed tokens are rejected from memory. A Bloom filter has no
+false negatives; revoked or expired tokens linger as false positives (they
+still get a 404 from the database) until the next rebuild.
+
+The filter is built from the database at startup. ``add`` covers tokens
+created by this worker; other workers notice through a shared epoch file
+and pull tokens created since their last sync before rejecting anything.
+A token missing from the filter is only rejected once no sync is pending
+or running.
+"""
+import asyncio
+import hashlib
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import metrics
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.share_token import ShareToken
+from app.services.cache import FileEpoch
+
+# Tokens committed by another worker shortly before our last sync are re-read
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one BLAKE2b digest"""
+    
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+    
+    def estimated_error_rate(self) -> float:
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+_filter: Optional[BloomFilter] = None
+_epoch = FileEpoch(settings.TOKEN_FILTER_EPOCH_PATH)
+_synced_at: Optional[datetime] = None
+# Set when another worker announced tokens we have not pulled yet
+_stale = False
+_sync_lock = asyncio.Lock()
+_rebuild_task: Optional[asyncio.Task] = None
+_rejected = 0
+_passed = 0
+_false_positives = 0
+_rebuilds = 0
+_last_rebuild_ms = 0.0
+
+
+def load_filter() -> None:
+    """Build the filter from every active token; called at startup and to purge revoked tokens"""
+    global _filter, _synced_at, _rebuilds, _last_rebuild_ms
+    if not settings.TOKEN_FILTER_ENABLED:
+        return
+    started = time.perf_counter()
+    synced_at = datetime.utcnow()
+    active = ShareToken.is_active == True
+    db = SessionLocal()
+    try:
+        count = db.scalar(select(func.count()).select_from(ShareToken).where(active))
+        # Leave room to grow before the next rebuild
+        bloom = BloomFilter(max(settings.TOKEN_FILTER_CAPACITY, count * 2), settings.TOKEN_FILTER_ERROR_RATE)
+        tokens = db.execute(select(ShareToken.token).where(active).execution_options(yield_per=10000))
+        for token in tokens.scalars():
+            bloom.add(token)
+    finally:
+        db.close()
+    _filter = bloom
+    _synced_at = synced_at
+    _rebuilds += 1
+    _last_rebuild_ms = round((time.perf_counter() - started) * 1000, 1)
+    print(f"Loaded share token filter with {bloom.count} tokens")
+
+
+def add(token: str) -> None:
+    """Record a token created by this worker and tell the other workers to sync"""
+    global _rebuild_task
+    if _filter is None:
+        return
+    _filter.add(token)
+    _epoch.bump()
+    if _filter.count >= _filter.capacity and _rebuild_task is None:
+        # Past capacity the error rate climbs; rebuild at double the size off the event loop
+        _rebuild_task = asyncio.create_task(_rebuild())
+
+
+async def _rebuild() -> None:
+    global _rebuild_task, _stale
+    try:
+        await asyncio.to_thread(load_filter)
+        # Pull tokens committed while the rebuild was reading
+        _stale = True
+    except Exception as e:
+        print(f"Error rebuilding share token filter: {e}")
+    finally:
+        _rebuild_task = None
+
+
+async def _sync(db: AsyncSession) -> None:
+    global _synced_at
+    synced_at = datetime.utcnow()
+    result = await db.execute(select(ShareToken.token).where(
+        ShareToken.created_at >= _synced_at - SYNC_OVERLAP,
+        ShareToken.is_active == True
+    ))
+    for token in result.scalars():
+        _filter.add(token)
+    _synced_at = synced_at
+
+
+async def might_exist(db: AsyncSession, token: str) -> bool:
+    """False only when ``token`` is certainly not an active share token"""
+    global _rejected, _passed, _stale
+    if _filter is None or _rebuild_task is not None:
+        # No filter to trust yet; let the database decide
+        return True
+    if _epoch.changed():
+        _stale = True
+    if token not in _filter and (_stale or _sync_lock.locked()):
+        # Wait for a running sync, or run one, before rejecting
+        async with _sync_lock:
+            if _stale:
+                _stale = False
+                try:
+                    await _sync(db)
+                except Exception:
+                    _stale = True
+                    raise
+    if token in _filter:
+        _passed += 1
+        return True
+    _rejected += 1
+    return False
+
+
+def record_false_positive() -> None:
+    global _false_positives
+    _false_positives += 1
+
+
+def stats() -> Dict[str, Any]:
+    if _filter is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "tokens": _filter.count,
+        "capacity": _filter.capacity,
+        "bytes": len(_filter._bits),
+        "hashes": _filter.num_hashes,
+        "estimated_error_rate": round(_filter.estimated_error_rate(), 6),
+        "rejected": _rejected,
+        "passed": _passed,
+        "false_positives": _false_positives,
+        "rebuilds": _rebuilds,
+        "last_rebuild_ms": _last_rebuild_ms,
+    }
+
+
+metrics.register("token_filter", stats)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+
+# Settings are read at import time, so point every file the app writes at a
+# scratch directory before anything under app/ is imported
+_scratch = tempfile.mkdtemp(prefix="carevault-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_scratch}/carevault.db",
+    "RXNAV_BASE_URL": "http://127.0.0.1:9/REST",
+    "RXNAV_TIMEOUT_SECONDS": "0.2",
+    "RXNAV_CACHE_PATH": "",
+    "AI_SUMMARY_CACHE_PATH": "",
+    "OPENAI_API_KEY": "",
+    "QR_CACHE_DIR": "",
+    "SHARE_CACHE_EPOCH_PATH": "",
+    "TOKEN_FILTER_EPOCH_PATH": "",
+    "PDF_ARTIFACT_DIR": os.path.join(_scratch, "pdf"),
+    "SHARE_RATE_LIMIT_BURST": "100000",
+})
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.db.database import async_engine
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+def _login(client: TestClient, email: str, password: str) -> dict:
+    response = client.post("/api/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def doctor_headers(client):
+    return _login(client, "doctor@carevault.com", "doctor123")
+
+
+@pytest.fixture(scope="session")
+def patient_headers(client):
+    return _login(client, "patient@carevault.com", "patient123")
+
+
+class QueryLog:
+    """SQL statements the request handlers run through the async engine"""
+    
+    def __init__(self):
+        self.statements = []
+    
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+    
+    def __len__(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def queries():
+    log = QueryLog()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", log)
+    yield log
+    event.remove(async_engine.sync_engine, "before_cursor_execute", log)
+
+
+def create_appointment(client: TestClient, headers: dict) -> dict:
+    response = client.post("/api/appointments/", headers=headers, json={
+        "patient_name": "Jane Doe",
+        "patient_email": "patient@carevault.com",
+        "appointment_date": "2026-11-02T09:30:00",
+        "reason": "Follow-up",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def create_prescription(client: TestClient, headers: dict, appointment_id: int) -> dict:
+    response = client.post("/api/prescriptions/", headers=headers, json={
+        "appointment_id": appointment_id,
+        "medications": [
+            {"name": "warfarin", "dosage": "5mg", "frequency": "daily"},
+            {"name": "aspirin", "dosage": "81mg", "frequency": "daily"},
+        ],
+        # A finished analysis keeps the background workers out of the way
+        "ai_interactions": {"status": "complete", "interactions": []},
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
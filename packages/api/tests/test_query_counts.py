@@ -0,0 +1,36 @@
+"""List endpoints must run a fixed number of queries, however many rows they return."""
+from tests.conftest import create_appointment, create_prescription
+
+
+def _count(client, queries, path, headers, expected_rows):
+    queries.statements.clear()
+    response = client.get(path, headers=headers, params={"limit": 500})
+    assert response.status_code == 200, response.text
+    assert len(response.json()) >= expected_rows
+    return len(queries)
+
+
+def test_appointment_list_query_count_is_constant(client, doctor_headers, queries):
+    for _ in range(2):
+        create_appointment(client, doctor_headers)
+    few = _count(client, queries, "/api/appointments/", doctor_headers, 2)
+    
+    for _ in range(20):
+        create_appointment(client, doctor_headers)
+    many = _count(client, queries, "/api/appointments/", doctor_headers, 22)
+    
+    assert few == many
+
+
+def test_prescription_list_query_count_is_constant(client, doctor_headers, queries):
+    appointment = create_appointment(client, doctor_headers)
+    for _ in range(2):
+        create_prescription(client, doctor_headers, appointment["id"])
+    few = _count(client, queries, "/api/prescriptions/", doctor_headers, 2)
+    
+    for _ in range(20):
+        appointment = create_appointment(client, doctor_headers)
+        create_prescription(client, doctor_headers, appointment["id"])
+    many = _count(client, queries, "/api/prescriptions/", doctor_headers, 22)
+    
+    assert few == many
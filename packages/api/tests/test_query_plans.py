@@ -0,0 +1,49 @@
+"""The hot-path queries must be planned on the composite indexes from migration 0002."""
+from typing import List
+from app.db.database import engine
+from tests.conftest import create_appointment, create_prescription
+
+
+def _plan(queries, prefix: str) -> List[str]:
+    """EXPLAIN QUERY PLAN details for the logged statement starting with ``prefix``"""
+    for statement, parameters in queries.statements:
+        if " ".join(statement.split()).startswith(prefix):
+            with engine.connect() as connection:
+                rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)).all()
+            return [row[-1] for row in rows]
+    raise AssertionError(f"No statement starting with {prefix!r} was run")
+
+
+def _uses(plan: List[str], index: str) -> bool:
+    return any(f"USING INDEX {index} " in detail for detail in plan)
+
+
+def test_appointment_lists_use_schedule_indexes(client, doctor_headers, patient_headers, queries):
+    create_appointment(client, doctor_headers)
+    
+    queries.statements.clear()
+    client.get("/api/appointments/", headers=doctor_headers)
+    assert _uses(_plan(queries, "SELECT appointments.id"), "ix_appointments_doctor_scheduled")
+    
+    queries.statements.clear()
+    client.get("/api/appointments/", headers=patient_headers)
+    assert _uses(_plan(queries, "SELECT appointments.id"), "ix_appointments_patient_scheduled")
+
+
+def test_prescription_list_uses_appointment_index(client, doctor_headers, queries):
+    appointment = create_appointment(client, doctor_headers)
+    create_prescription(client, doctor_headers, appointment["id"])
+    
+    queries.statements.clear()
+    client.get("/api/prescriptions/", headers=doctor_headers)
+    assert _uses(_plan(queries, "SELECT prescriptions.id"), "ix_prescriptions_appointment_created")
+
+
+def test_share_token_lookup_uses_prescription_index(client, doctor_headers, patient_headers, queries):
+    appointment = create_appointment(client, doctor_headers)
+    prescription = create_prescription(client, doctor_headers, appointment["id"])
+    
+    queries.statements.clear()
+    response = client.delete(f"/api/share/prescriptions/{prescription['id']}", headers=patient_headers)
+    assert response.status_code == 200, response.text
+    assert _uses(_plan(queries, "SELECT share_tokens.id"), "ix_share_tokens_prescription_active")
@@ -10,7 +10,7 @@ import { Label } from "@/components/ui/label"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
 import { toast } from "sonner"
 import { Calendar, Clock, User, Plus, AlertCircle, Zap } from "lucide-react"
-import api from "@/lib/api"
+import api, { getPage } from "@/lib/api"
 
 interface Patient {
   id: number
@@ -75,6 +75,7 @@ export default function NewAppointment() {
   const [loading, setLoading] = useState(false)
   const [patients, setPatients] = useState<Patient[]>([])
   const [loadingPatients, setLoadingPatients] = useState(true)
+  const [patientsCursor, setPatientsCursor] = useState<string>()
   const [showCreatePatient, setShowCreatePatient] = useState(false)
   const [creatingPatient, setCreatingPatient] = useState(false)
   const [formData, setFormData] = useState({
@@ -97,11 +98,12 @@ export default function NewAppointment() {
     fetchPatients()
   }, [])
 
-  const fetchPatients = async () => {
+  // One page of patients at a time; the picker offers to load the next
+  const fetchPatients = async (cursor?: string) => {
     try {
-      const response = await api.get("/users")
-      const patientsOnly = response.data.filter((u: any) => u.role === "patient")
-      setPatients(patientsOnly)
+      const page = await getPage<Patient>("/users", { role: "patient" }, cursor)
+      setPatients(prev => cursor ? [...prev, ...page.rows] : page.rows)
+      setPatientsCursor(page.nextCursor)
     } catch (error) {
       console.error("Failed to fetch patients:", error)
     } finally {
@@ -333,6 +335,11 @@ export default function NewAppointment() {
                   No patients found. Create a new patient first.
                 </p>
               )}
+              {patientsCursor && (
+                <Button type="button" variant="link" className="px-0" onClick={() => fetchPatients(patientsCursor)}>
+                  Load more patients
+                </Button>
+              )}
             </div>
 
             {/* Date and Time */}
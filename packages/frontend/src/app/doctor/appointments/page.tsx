@@ -26,7 +26,7 @@ import {
   MapPin
 } from "lucide-react"
 import Link from "next/link"
-import api from "@/lib/api"
+import api, { getPage } from "@/lib/api"
 import Breadcrumbs from "@/components/Breadcrumbs"
 
 interface Appointment {
@@ -48,6 +48,8 @@ export default function AppointmentsPage() {
   const [appointments, setAppointments] = useState<Appointment[]>([])
   const [filteredAppointments, setFilteredAppointments] = useState<Appointment[]>([])
   const [loadingAppointments, setLoadingAppointments] = useState(true)
+  const [nextCursor, setNextCursor] = useState<string>()
+  const [loadingMore, setLoadingMore] = useState(false)
   const [searchTerm, setSearchTerm] = useState("")
   const [statusFilter, setStatusFilter] = useState("all")
   const [selectedAppointment, setSelectedAppointment] = useState<Appointment | null>(null)
@@ -65,13 +67,12 @@ export default function AppointmentsPage() {
     filterAppointments()
   }, [appointments, searchTerm, statusFilter])
 
-  const fetchAppointments = async () => {
+  // The server returns appointments newest first, one page at a time
+  const fetchAppointments = async (cursor?: string) => {
     try {
-      const response = await api.get("/appointments")
-      const sortedAppointments = response.data.sort((a: Appointment, b: Appointment) => 
-        new Date(b.scheduled_at).getTime() - new Date(a.scheduled_at).getTime()
-      )
-      setAppointments(sortedAppointments)
+      const page = await getPage<Appointment>("/appointments", {}, cursor)
+      setAppointments(prev => cursor ? [...prev, ...page.rows] : page.rows)
+      setNextCursor(page.nextCursor)
     } catch (error) {
       console.error("Failed to fetch appointments:", error)
       toast.error("Failed to load appointments")
@@ -80,6 +81,12 @@ export default function AppointmentsPage() {
     }
   }
 
+  const loadMoreAppointments = async () => {
+    setLoadingMore(true)
+    await fetchAppointments(nextCursor)
+    setLoadingMore(false)
+  }
+
   const filterAppointments = () => {
     let filtered = appointments
 
@@ -343,6 +350,11 @@ export default function AppointmentsPage() {
             </Card>
           ))
         )}
+        {nextCursor && (
+          <Button variant="outline" className="w-full" onClick={loadMoreAppointments} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more appointments"}
+          </Button>
+        )}
       </div>
 
       {/* Appointment Details Modal */}
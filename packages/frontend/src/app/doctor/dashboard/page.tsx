@@ -8,15 +8,15 @@ import { Button } from "@/components/ui/button"
 import { toast } from "sonner"
 import { Calendar, FileText, Users, Plus } from "lucide-react"
 import Link from "next/link"
-import api from "@/lib/api"
+import api, { countLabel, getPage } from "@/lib/api"
 
 export default function DoctorDashboard() {
   const { user, loading } = useAuth()
   const router = useRouter()
   const [stats, setStats] = useState({
-    todayAppointments: 0,
-    totalPatients: 0,
-    recentPrescriptions: 0
+    todayAppointments: "0",
+    totalPatients: "0",
+    recentPrescriptions: "0"
   })
   const [recentAppointments, setRecentAppointments] = useState<any[]>([])
 
@@ -30,51 +30,27 @@ export default function DoctorDashboard() {
 
   const fetchStats = async () => {
     try {
-      // Fetch users to count patients
-      const usersResponse = await api.get("/users")
-      const patients = usersResponse.data.filter((u: any) => u.role === "patient")
-      
-      // Fetch appointments
-      const appointmentsResponse = await api.get("/appointments")
-      const appointments = appointmentsResponse.data
-      
-      // Fetch prescriptions
-      const prescriptionsResponse = await api.get("/prescriptions")
-      const prescriptions = prescriptionsResponse.data
-      
-      // Debug logging
-      console.log("Fetched appointments:", appointments)
-      console.log("Total appointments:", appointments.length)
-      
-      // Calculate today's appointments
-      const today = new Date().toISOString().split('T')[0]
-      console.log("Today's date string:", today)
-      
-      const todayAppointments = appointments.filter((apt: any) => {
-        console.log("Appointment scheduled_at:", apt.scheduled_at)
-        const appointmentDate = apt.scheduled_at.split('T')[0]
-        console.log("Appointment date:", appointmentDate, "Today:", today, "Match:", appointmentDate === today)
-        return appointmentDate === today
-      }).length
-      
-      console.log("Today's appointments count:", todayAppointments)
-      
-      // Count recent prescriptions (last 7 days)
+      // Each figure is one bounded page, filtered and sorted by the server
+      const now = new Date();
+      const todayStr = now.toISOString().split('T')[0];
+      const tomorrow = new Date(`${todayStr}T00:00:00Z`)
+      tomorrow.setUTCDate(tomorrow.getUTCDate() + 1)
+      const tomorrowStr = tomorrow.toISOString().split('T')[0]
       const weekAgo = new Date()
       weekAgo.setDate(weekAgo.getDate() - 7)
-      const recentPrescriptions = prescriptions.filter((p: any) => 
-        new Date(p.created_at) > weekAgo
-      ).length
+      
+      const [patients, today, upcoming, past, prescriptions] = await Promise.all([
+        getPage("/users", { role: "patient" }),
+        getPage("/appointments", { date_from: `${todayStr}T00:00:00`, date_to: `${tomorrowStr}T00:00:00`, order: "asc" }),
+        getPage("/appointments", { date_from: `${tomorrowStr}T00:00:00`, order: "asc", limit: 2 }),
+        getPage("/appointments", { date_to: `${todayStr}T00:00:00`, limit: 2 }),
+        getPage("/prescriptions", { date_from: weekAgo.toISOString().slice(0, 19) })
+      ])
       
       // Get up to 2 appointments for today, then upcoming, then past
-      const now = new Date();
-      const todayStr = now.toISOString().split('T')[0];
-      const todaysAppointments = appointments.filter((a: any) => a.scheduled_at.split('T')[0] === todayStr)
-        .sort((a: any, b: any) => new Date(a.scheduled_at).getTime() - new Date(b.scheduled_at).getTime());
-      const upcomingAppointments = appointments.filter((a: any) => new Date(a.scheduled_at) > now)
-        .sort((a: any, b: any) => new Date(a.scheduled_at).getTime() - new Date(b.scheduled_at).getTime());
-      const pastAppointments = appointments.filter((a: any) => new Date(a.scheduled_at) < now && a.scheduled_at.split('T')[0] !== todayStr)
-        .sort((a: any, b: any) => new Date(b.scheduled_at).getTime() - new Date(a.scheduled_at).getTime());
+      const todaysAppointments = today.rows
+      const upcomingAppointments = upcoming.rows
+      const pastAppointments = past.rows
 
       let recent: any[] = [];
       if (todaysAppointments.length >= 2) {
@@ -95,9 +71,9 @@ export default function DoctorDashboard() {
       setRecentAppointments(recent);
       
       setStats({
-        todayAppointments,
-        totalPatients: patients.length,
-        recentPrescriptions
+        todayAppointments: countLabel(today.rows.length, today.nextCursor),
+        totalPatients: countLabel(patients.rows.length, patients.nextCursor),
+        recentPrescriptions: countLabel(prescriptions.rows.length, prescriptions.nextCursor)
       })
     } catch (error) {
       console.error("Failed to fetch stats:", error)
@@ -22,7 +22,7 @@ import {
   Activity
 } from "lucide-react"
 import Link from "next/link"
-import api from "@/lib/api"
+import { countLabel, getPage } from "@/lib/api"
 import Breadcrumbs from "@/components/Breadcrumbs"
 
 interface Patient {
@@ -33,8 +33,6 @@ interface Patient {
   phone_number?: string
   date_of_birth?: string
   created_at: string
-  appointments_count?: number
-  prescriptions_count?: number
 }
 
 export default function Patients() {
@@ -43,6 +41,11 @@ export default function Patients() {
   const [patients, setPatients] = useState<Patient[]>([])
   const [filteredPatients, setFilteredPatients] = useState<Patient[]>([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState<string>()
+  const [loadingMore, setLoadingMore] = useState(false)
+  // Display counts ("100+" when the server has more pages)
+  const [totals, setTotals] = useState({ appointments: "0", prescriptions: "0" })
+  const [patientCounts, setPatientCounts] = useState({ appointments: "0", prescriptions: "0" })
   const [searchTerm, setSearchTerm] = useState("")
   const [selectedPatient, setSelectedPatient] = useState<Patient | null>(null)
   const [showDetails, setShowDetails] = useState(false)
@@ -53,6 +56,7 @@ export default function Patients() {
   useEffect(() => {
     if (user && user.role === "doctor") {
       fetchPatients()
+      fetchTotals()
     }
   }, [user])
 
@@ -60,26 +64,12 @@ export default function Patients() {
     filterPatients()
   }, [patients, searchTerm])
 
-  const fetchPatients = async () => {
+  // Patients come one page at a time; further pages load on demand
+  const fetchPatients = async (cursor?: string) => {
     try {
-      const [usersResponse, appointmentsResponse, prescriptionsResponse] = await Promise.all([
-        api.get("/users"),
-        api.get("/appointments"),
-        api.get("/prescriptions")
-      ])
-      
-      const patientsOnly = usersResponse.data.filter((u: any) => u.role === "patient")
-      const appointments = appointmentsResponse.data
-      const prescriptions = prescriptionsResponse.data
-      
-      // Add counts to patients
-      const patientsWithCounts = patientsOnly.map((patient: Patient) => ({
-        ...patient,
-        appointments_count: appointments.filter((apt: any) => apt.patient_email === patient.email).length,
-        prescriptions_count: prescriptions.filter((rx: any) => rx.patient_email === patient.email).length
-      }))
-      
-      setPatients(patientsWithCounts)
+      const page = await getPage<Patient>("/users", { role: "patient" }, cursor)
+      setPatients(prev => cursor ? [...prev, ...page.rows] : page.rows)
+      setNextCursor(page.nextCursor)
     } catch (error) {
       console.error("Failed to fetch patients:", error)
       toast.error("Failed to load patients")
@@ -88,6 +78,27 @@ export default function Patients() {
     }
   }
 
+  const loadMorePatients = async () => {
+    setLoadingMore(true)
+    await fetchPatients(nextCursor)
+    setLoadingMore(false)
+  }
+
+  const fetchTotals = async () => {
+    try {
+      const [appointments, prescriptions] = await Promise.all([
+        getPage("/appointments"),
+        getPage("/prescriptions")
+      ])
+      setTotals({
+        appointments: countLabel(appointments.rows.length, appointments.nextCursor),
+        prescriptions: countLabel(prescriptions.rows.length, prescriptions.nextCursor)
+      })
+    } catch (error) {
+      console.error("Failed to fetch totals:", error)
+    }
+  }
+
   const filterPatients = () => {
     if (!searchTerm) {
       setFilteredPatients(patients)
@@ -107,20 +118,18 @@ export default function Patients() {
     setLoadingPatientData(true)
     
     try {
-      const [appointmentsResponse, prescriptionsResponse] = await Promise.all([
-        api.get("/appointments"),
-        api.get("/prescriptions")
+      // The server narrows both lists to this patient
+      const [appointments, prescriptions] = await Promise.all([
+        getPage("/appointments", { patient_id: patient.id }),
+        getPage("/prescriptions", { patient_id: patient.id })
       ])
       
-      const patientAppointments = appointmentsResponse.data.filter(
-        (apt: any) => apt.patient_email === patient.email
-      )
-      const patientPrescriptions = prescriptionsResponse.data.filter(
-        (rx: any) => rx.patient_email === patient.email
-      )
-      
-      setPatientAppointments(patientAppointments)
-      setPatientPrescriptions(patientPrescriptions)
+      setPatientAppointments(appointments.rows)
+      setPatientPrescriptions(prescriptions.rows)
+      setPatientCounts({
+        appointments: countLabel(appointments.rows.length, appointments.nextCursor),
+        prescriptions: countLabel(prescriptions.rows.length, prescriptions.nextCursor)
+      })
     } catch (error) {
       console.error("Failed to fetch patient data:", error)
       toast.error("Failed to load patient details")
@@ -188,7 +197,7 @@ export default function Patients() {
             <Users className="h-4 w-4 text-muted-foreground" />
           </CardHeader>
           <CardContent>
-            <div className="text-2xl font-bold">{patients.length}</div>
+            <div className="text-2xl font-bold">{countLabel(patients.length, nextCursor)}</div>
             <p className="text-xs text-muted-foreground">Registered patients</p>
           </CardContent>
         </Card>
@@ -198,9 +207,7 @@ export default function Patients() {
             <Calendar className="h-4 w-4 text-muted-foreground" />
           </CardHeader>
           <CardContent>
-            <div className="text-2xl font-bold">
-              {patients.reduce((sum, p) => sum + (p.appointments_count || 0), 0)}
-            </div>
+            <div className="text-2xl font-bold">{totals.appointments}</div>
             <p className="text-xs text-muted-foreground">All time</p>
           </CardContent>
         </Card>
@@ -210,9 +217,7 @@ export default function Patients() {
             <FileText className="h-4 w-4 text-muted-foreground" />
           </CardHeader>
           <CardContent>
-            <div className="text-2xl font-bold">
-              {patients.reduce((sum, p) => sum + (p.prescriptions_count || 0), 0)}
-            </div>
+            <div className="text-2xl font-bold">{totals.prescriptions}</div>
             <p className="text-xs text-muted-foreground">All time</p>
           </CardContent>
         </Card>
@@ -278,14 +283,6 @@ export default function Patients() {
                           <span>{patient.phone_number}</span>
                         </div>
                       )}
-                      <div className="flex items-center gap-2">
-                        <Calendar className="h-4 w-4" />
-                        <span>{patient.appointments_count || 0} appointments</span>
-                      </div>
-                      <div className="flex items-center gap-2">
-                        <FileText className="h-4 w-4" />
-                        <span>{patient.prescriptions_count || 0} prescriptions</span>
-                      </div>
                     </div>
                   </div>
                   
@@ -317,6 +314,11 @@ export default function Patients() {
             </Card>
           ))
         )}
+        {nextCursor && (
+          <Button variant="outline" className="w-full" onClick={loadMorePatients} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more patients"}
+          </Button>
+        )}
       </div>
 
       {/* Patient Details Modal */}
@@ -375,11 +377,11 @@ export default function Patients() {
                   <div className="grid gap-3">
                     <div className="flex items-center gap-3">
                       <Calendar className="h-4 w-4 text-muted-foreground" />
-                      <span>{selectedPatient.appointments_count || 0} total appointments</span>
+                      <span>{loadingPatientData ? "..." : patientCounts.appointments} total appointments</span>
                     </div>
                     <div className="flex items-center gap-3">
                       <FileText className="h-4 w-4 text-muted-foreground" />
-                      <span>{selectedPatient.prescriptions_count || 0} prescriptions</span>
+                      <span>{loadingPatientData ? "..." : patientCounts.prescriptions} prescriptions</span>
                     </div>
                     <div className="flex items-center gap-3">
                       <Activity className="h-4 w-4 text-muted-foreground" />
@@ -37,6 +37,7 @@ export default function PrescriptionDetail() {
   const router = useRouter()
   const [prescription, setPrescription] = useState<Prescription | null>(null)
   const [loading, setLoading] = useState(true)
+  const [qrSrc, setQrSrc] = useState<string | null>(null)
 
   useEffect(() => {
     fetchPrescription()
@@ -46,6 +47,11 @@ export default function PrescriptionDetail() {
     try {
       const response = await api.get(`/prescriptions/${id}`)
       setPrescription(response.data)
+      if (response.data.qr_code) {
+        // qr_code points at the authenticated qr.png endpoint; load it as a blob
+        const qr = await api.get(`/prescriptions/${id}/qr.png`, { responseType: "blob" })
+        setQrSrc(URL.createObjectURL(qr.data))
+      }
     } catch (error) {
       toast.error("Failed to load prescription")
       router.push("/doctor/dashboard")
@@ -156,10 +162,10 @@ export default function PrescriptionDetail() {
               </CardDescription>
             </CardHeader>
             <CardContent className="space-y-4">
-              {prescription.qr_code && (
+              {qrSrc && (
                 <div className="flex justify-center">
                   <img
-                    src={prescription.qr_code}
+                    src={qrSrc}
                     alt="Prescription QR Code"
                     className="w-48 h-48"
                   />
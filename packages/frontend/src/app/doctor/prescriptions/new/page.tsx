@@ -11,7 +11,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@
 import { Textarea } from "@/components/ui/textarea"
 import { toast } from "sonner"
 import { AlertCircle, Plus, Trash2, Loader2 } from "lucide-react"
-import api from "@/lib/api"
+import api, { getPage } from "@/lib/api"
 
 interface Medication {
   name: string
@@ -60,6 +60,7 @@ export default function NewPrescription() {
   const [checkingInteractions, setCheckingInteractions] = useState(false)
   const [appointments, setAppointments] = useState<Appointment[]>([])
   const [selectedAppointmentId, setSelectedAppointmentId] = useState<number | null>(null)
+  const [appointmentsCursor, setAppointmentsCursor] = useState<string>()
   const [aiSummary, setAiSummary] = useState("")
   const [medications, setMedications] = useState<Medication[]>([
     { name: "", dosage: "", frequency: "", timing: "" }
@@ -69,16 +70,18 @@ export default function NewPrescription() {
   const [openSuggestionIndex, setOpenSuggestionIndex] = useState<number | null>(null)
   const suggestionRefs = useRef<(HTMLDivElement | null)[]>([])
 
-  // Load appointments for this doctor
-  useEffect(() => {
-    const loadAppointments = async () => {
-      try {
-        const response = await api.get('/appointments')
-        setAppointments(response.data)
-      } catch (error) {
-        toast.error('Failed to load appointments')
-      }
+  // Load appointments for this doctor, newest first, one page at a time
+  const loadAppointments = async (cursor?: string) => {
+    try {
+      const page = await getPage<Appointment>('/appointments', {}, cursor)
+      setAppointments(prev => cursor ? [...prev, ...page.rows] : page.rows)
+      setAppointmentsCursor(page.nextCursor)
+    } catch (error) {
+      toast.error('Failed to load appointments')
     }
+  }
+
+  useEffect(() => {
     loadAppointments()
   }, [])
 
@@ -257,6 +260,11 @@ export default function NewPrescription() {
                     ))}
                   </SelectContent>
                 </Select>
+                {appointmentsCursor && (
+                  <Button type="button" variant="link" className="px-0" onClick={() => loadAppointments(appointmentsCursor)}>
+                    Load older appointments
+                  </Button>
+                )}
               </div>
 
               <div className="space-y-2">
@@ -22,7 +22,7 @@ import {
   MapPin,
   Phone
 } from "lucide-react"
-import api from "@/lib/api"
+import api, { countLabel, getPage } from "@/lib/api"
 import Breadcrumbs from "@/components/Breadcrumbs"
 
 interface Appointment {
@@ -45,6 +45,8 @@ export default function PatientAppointments() {
   const [appointments, setAppointments] = useState<Appointment[]>([])
   const [filteredAppointments, setFilteredAppointments] = useState<Appointment[]>([])
   const [loadingAppointments, setLoadingAppointments] = useState(true)
+  const [nextCursor, setNextCursor] = useState<string>()
+  const [loadingMore, setLoadingMore] = useState(false)
   const [searchTerm, setSearchTerm] = useState("")
   const [statusFilter, setStatusFilter] = useState("all")
   const [selectedAppointment, setSelectedAppointment] = useState<Appointment | null>(null)
@@ -62,17 +64,12 @@ export default function PatientAppointments() {
     filterAppointments()
   }, [appointments, searchTerm, statusFilter])
 
-  const fetchAppointments = async () => {
+  // The server returns this patient's appointments newest first, one page at a time
+  const fetchAppointments = async (cursor?: string) => {
     try {
-      const response = await api.get("/appointments")
-      // Filter appointments for the current patient
-      const userAppointments = response.data.filter(
-        (apt: Appointment) => apt.patient_email === user?.email
-      )
-      const sortedAppointments = userAppointments.sort((a: Appointment, b: Appointment) => 
-        new Date(b.scheduled_at).getTime() - new Date(a.scheduled_at).getTime()
-      )
-      setAppointments(sortedAppointments)
+      const page = await getPage<Appointment>("/appointments", {}, cursor)
+      setAppointments(prev => cursor ? [...prev, ...page.rows] : page.rows)
+      setNextCursor(page.nextCursor)
     } catch (error) {
       console.error("Failed to fetch appointments:", error)
       toast.error("Failed to load appointments")
@@ -81,6 +78,12 @@ export default function PatientAppointments() {
     }
   }
 
+  const loadMoreAppointments = async () => {
+    setLoadingMore(true)
+    await fetchAppointments(nextCursor)
+    setLoadingMore(false)
+  }
+
   const filterAppointments = () => {
     let filtered = appointments
 
@@ -182,7 +185,7 @@ export default function PatientAppointments() {
             <Calendar className="h-4 w-4 text-blue-600" />
           </CardHeader>
           <CardContent>
-            <div className="text-2xl font-bold text-blue-900">{appointments.length}</div>
+            <div className="text-2xl font-bold text-blue-900">{countLabel(appointments.length, nextCursor)}</div>
             <p className="text-xs text-blue-600">All time</p>
           </CardContent>
         </Card>
@@ -194,7 +197,7 @@ export default function PatientAppointments() {
           </CardHeader>
           <CardContent>
             <div className="text-2xl font-bold text-green-900">
-              {appointments.filter(a => a.status === 'completed').length}
+              {countLabel(appointments.filter(a => a.status === 'completed').length, nextCursor)}
             </div>
             <p className="text-xs text-green-600">Finished visits</p>
           </CardContent>
@@ -339,6 +342,11 @@ export default function PatientAppointments() {
             </Card>
           ))
         )}
+        {nextCursor && (
+          <Button variant="outline" className="w-full" onClick={loadMoreAppointments} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more appointments"}
+          </Button>
+        )}
       </div>
 
       {/* Appointment Details Modal */}
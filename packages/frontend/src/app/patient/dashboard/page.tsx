@@ -8,7 +8,7 @@ import { Button } from "@/components/ui/button"
 import { toast } from "sonner"
 import { Calendar, FileText, QrCode, Shield, AlertCircle } from "lucide-react"
 import Link from "next/link"
-import api from "@/lib/api"
+import api, { countLabel, getPage } from "@/lib/api"
 
 interface Prescription {
   id: number
@@ -48,6 +48,8 @@ export default function PatientDashboard() {
   const router = useRouter()
   const [prescriptions, setPrescriptions] = useState<Prescription[]>([])
   const [appointments, setAppointments] = useState<Appointment[]>([])
+  // Cursors of the next pages; only the first page is loaded here
+  const [moreCursors, setMoreCursors] = useState<{ prescriptions?: string, appointments?: string }>({})
   const [loadingData, setLoadingData] = useState(true)
 
   useEffect(() => {
@@ -64,15 +66,19 @@ export default function PatientDashboard() {
 
   const fetchData = async () => {
     try {
-      const [prescriptionsRes, appointmentsRes] = await Promise.all([
-        api.get("/prescriptions"),
-        api.get("/appointments")
+      const [prescriptionPage, appointmentPage] = await Promise.all([
+        getPage<Prescription>("/prescriptions"),
+        getPage<Appointment>("/appointments")
       ])
-      setPrescriptions(prescriptionsRes.data)
-      setAppointments(appointmentsRes.data)
+      setPrescriptions(prescriptionPage.rows)
+      setAppointments(appointmentPage.rows)
+      setMoreCursors({
+        prescriptions: prescriptionPage.nextCursor,
+        appointments: appointmentPage.nextCursor
+      })
       console.log("Patient data loaded:", {
-        prescriptions: prescriptionsRes.data.length,
-        appointments: appointmentsRes.data.length
+        prescriptions: prescriptionPage.rows.length,
+        appointments: appointmentPage.rows.length
       })
     } catch (error) {
       console.error("Failed to load patient data:", error)
@@ -129,7 +135,7 @@ export default function PatientDashboard() {
             <FileText className="h-4 w-4 text-blue-600" />
           </CardHeader>
           <CardContent>
-            <div className="text-2xl font-bold text-blue-900">{prescriptions.length}</div>
+            <div className="text-2xl font-bold text-blue-900">{countLabel(prescriptions.length, moreCursors.prescriptions)}</div>
             <p className="text-xs text-blue-600">Prescription records</p>
           </CardContent>
         </Card>
@@ -140,7 +146,7 @@ export default function PatientDashboard() {
             <Calendar className="h-4 w-4 text-green-600" />
           </CardHeader>
           <CardContent>
-            <div className="text-2xl font-bold text-green-900">{appointments.length}</div>
+            <div className="text-2xl font-bold text-green-900">{countLabel(appointments.length, moreCursors.appointments)}</div>
             <p className="text-xs text-green-600">Total appointments</p>
           </CardContent>
         </Card>
@@ -151,7 +157,7 @@ export default function PatientDashboard() {
             <QrCode className="h-4 w-4 text-purple-600" />
           </CardHeader>
           <CardContent>
-            <div className="text-2xl font-bold text-purple-900">{prescriptions.filter(p => p.share_token).length}</div>
+            <div className="text-2xl font-bold text-purple-900">{countLabel(prescriptions.filter(p => p.share_token).length, moreCursors.prescriptions)}</div>
             <p className="text-xs text-purple-600">Shareable prescriptions</p>
           </CardContent>
         </Card>
@@ -315,7 +321,7 @@ export default function PatientDashboard() {
             </div>
           ) : (
             <div className="text-sm">
-              <p className="font-medium mb-2">Active Shares: {prescriptions.filter(p => p.share_token).length}</p>
+              <p className="font-medium mb-2">Active Shares: {countLabel(prescriptions.filter(p => p.share_token).length, moreCursors.prescriptions)}</p>
               <p className="text-muted-foreground">
                 These prescriptions can be accessed by scanning their QR codes. Revoke access for any prescription to disable sharing immediately.
               </p>
@@ -8,7 +8,7 @@ import { Button } from "@/components/ui/button";
 import { toast } from "sonner";
 import { QrCode, Shield, FileText } from "lucide-react";
 import Link from "next/link";
-import api from "@/lib/api";
+import { getPage } from "@/lib/api";
 
 interface Prescription {
   id: number;
@@ -36,6 +36,8 @@ export default function PatientPrescriptionsPage() {
   const router = useRouter();
   const [prescriptions, setPrescriptions] = useState<Prescription[]>([]);
   const [loadingData, setLoadingData] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string>();
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     if (!loading && (!user || user.role !== "patient")) {
@@ -45,10 +47,12 @@ export default function PatientPrescriptionsPage() {
     }
   }, [user, loading, router]);
 
-  const fetchPrescriptions = async () => {
+  // The server returns prescriptions newest first, one page at a time
+  const fetchPrescriptions = async (cursor?: string) => {
     try {
-      const res = await api.get("/prescriptions");
-      setPrescriptions(res.data);
+      const page = await getPage<Prescription>("/prescriptions", {}, cursor);
+      setPrescriptions(prev => cursor ? [...prev, ...page.rows] : page.rows);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       toast.error("Failed to load prescriptions");
     } finally {
@@ -56,6 +60,12 @@ export default function PatientPrescriptionsPage() {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    await fetchPrescriptions(nextCursor);
+    setLoadingMore(false);
+  };
+
   if (loading || loadingData) {
     return <div className="flex items-center justify-center min-h-screen">Loading...</div>;
   }
@@ -130,6 +140,11 @@ export default function PatientPrescriptionsPage() {
                 </div>
               ))
             )}
+            {nextCursor && (
+              <Button variant="outline" className="w-full" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            )}
           </div>
         </CardContent>
       </Card>
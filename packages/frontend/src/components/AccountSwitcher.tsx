@@ -16,7 +16,7 @@ import {
   Settings,
   ChevronDown
 } from "lucide-react"
-import api from "@/lib/api"
+import api, { getPage } from "@/lib/api"
 
 interface DemoUser {
   id: number
@@ -39,9 +39,8 @@ export default function AccountSwitcher() {
 
   const fetchDemoUsers = async () => {
     try {
-      // Always use the public demo endpoint (no auth required, returns ALL users)
-      const response = await api.get("/users/demo")
-      const users = response.data.filter((u: any) => 
+      // Always use the public demo endpoint (no auth required); its first page is plenty for switching
+      const users = (await getPage("/users/demo")).rows.filter((u: any) => 
         u.role === "doctor" || u.role === "patient"
       )
       setDemoUsers(users)
@@ -39,6 +39,26 @@ api.interceptors.response.use(
 
 export default api;
 
+// List endpoints are keyset-paged: show the first page, and pass nextCursor
+// back (with the same params) only when the user asks for more
+export interface Page<T = any> {
+  rows: T[];
+  nextCursor?: string;
+}
+
+export const getPage = async <T = any>(
+  url: string,
+  params: Record<string, any> = {},
+  cursor?: string
+): Promise<Page<T>> => {
+  const response = await api.get(url, { params: cursor ? { ...params, cursor } : params });
+  return { rows: response.data, nextCursor: response.headers['x-next-cursor'] };
+};
+
+// Count of the rows loaded so far; "+" marks that the server has more pages
+export const countLabel = (count: number, nextCursor?: string) =>
+  `${count}${nextCursor ? '+' : ''}`;
+
 // Auth API
 export const authAPI = {
   login: (email: string, password: string) =>
@@ -54,7 +74,7 @@ export const userAPI = {
 
 // Appointments API
 export const appointmentAPI = {
-  getAll: () => api.get('/appointments'),
+  getAll: (cursor?: string) => getPage('/appointments', {}, cursor),
   getById: (id: number) => api.get(`/appointments/${id}`),
   create: (data: any) => api.post('/appointments', data),
   update: (id: number, data: any) => api.put(`/appointments/${id}`, data),
@@ -63,7 +83,7 @@ export const appointmentAPI = {
 
 // Prescriptions API
 export const prescriptionAPI = {
-  getAll: () => api.get('/prescriptions'),
+  getAll: (cursor?: string) => getPage('/prescriptions', {}, cursor),
   getById: (id: number) => api.get(`/prescriptions/${id}`),
   create: (data: any) => api.post('/prescriptions', data),
   update: (id: number, data: any) => api.put(`/prescriptions/${id}`, data),